@@ -1,15 +1,16 @@
 
 from __future__ import annotations
-from typing import Iterable
+import itertools
+from typing import Iterable, Optional
 from .graph_schema import CodeGraph
 
 def compact_for_llm(G: CodeGraph, token_budget_nodes: int = 400) -> CodeGraph:
     # naive compaction: limit number of nodes
-    nodes = list(G.g.nodes())[:token_budget_nodes]
+    nodes = list(itertools.islice(G.g.nodes(), token_budget_nodes))
     return G.subgraph_by_nodes(nodes)
 
-def export_json(G: CodeGraph, path: str):
-    G.export_json(path)
+def export_json(G: CodeGraph, path: str, indent: Optional[int] = None):
+    G.export_json(path, indent=indent)
 
 
 def export_graphml(G: CodeGraph, path: str):
@@ -40,14 +41,12 @@ def export_mermaid(G: CodeGraph, path: str, node_limit: int = 200):
 #         NodeType.FUNCTION: 2,
 #         NodeType.FILE: 1,
 #     }
-#     nodes = list(G.g.nodes())
-#     scored = []
-#     for n in nodes:
-#         d = G.g.nodes[n]
-#         deg = G.g.degree[n]
-#         scored.append((priority.get(d.get("type"), 0), deg, n))
-#     scored.sort(reverse=True)
-#     keep = set(n for _, _, n in scored[:token_budget_nodes])
+#     degrees = dict(G.g.degree())
+#     scored = (
+#         (priority.get(d.get("type"), 0), degrees[n], n)
+#         for n, d in G.g.nodes(data=True)
+#     )
+#     keep = set(n for _, _, n in heapq.nlargest(token_budget_nodes, scored))
 #     H = G.subgraph_by_nodes(keep)
 
 #     # strip bulky attrs
@@ -1,83 +1,171 @@
 
 from __future__ import annotations
-import os, io
+import os, io, pickle
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
 from .graph_schema import CodeGraph, Node, Edge, NodeType, EdgeType
-from .java_parser_treesitter import parse_java_source_ts
+from .java_parser_treesitter import _worker_init, parse_java_source_ts
 from .python_parser import parse_python_source
 from .resolver_java import resolve_calls as resolve_calls_java
 
-def build_graph_from_repo(repo_path: str, lang: str = "auto") -> CodeGraph:
+_PARSERS = {
+    ".java": parse_java_source_ts,
+    ".py": parse_python_source,
+}
+_LANG_EXTS = {"java": ".java", "python": ".py"}
+_SKIP_DIRS = frozenset({".git", "node_modules", "venv", ".venv", "__pycache__"})
+
+def _iter_source_files(repo_path: str, lang: str = "auto"):
+    """Yield (path, parser, stat) for every source file under repo_path, in os.walk order."""
+    if lang == "auto":
+        parsers = _PARSERS
+    else:
+        ext = _LANG_EXTS.get(lang)
+        parsers = {ext: _PARSERS[ext]} if ext else {}
+    if not parsers:
+        return
+    stack = [repo_path]
+    while stack:
+        subdirs = []
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in _SKIP_DIRS:
+                            subdirs.append(entry.path)
+                    elif entry.is_file():  # symlinked sources count, as with os.walk
+                        parser = parsers.get("." + entry.name.rpartition(".")[2].lower())
+                        if parser is not None:
+                            try:
+                                st = entry.stat()
+                            except OSError:
+                                st = None
+                            yield entry.path, parser, st
+        except OSError:
+            continue
+        stack.extend(reversed(subdirs))
+
+# Below this many files a process pool costs more to start than it saves.
+_PARALLEL_MIN_FILES = 64
+# Larger files are almost always generated code; parsing them is slow and useless.
+_MAX_FILE_BYTES = 2 << 20
+# path -> ((st_mtime_ns, st_size), pickled (nodes, edges)) for files parsed
+# earlier in this process, least recently used first; lets repeated builds
+# skip unchanged files. Kept pickled so every build gets its own node/edge
+# objects (graphs share attr containers with them), and capped so a
+# long-running process doesn't keep every repo it has ever seen.
+_PARSE_CACHE: "OrderedDict[str, Tuple[Tuple[int, int], bytes]]" = OrderedDict()
+_PARSE_CACHE_MAX_FILES = 4096
+
+def _parse_file(item):
+    """Read and parse one file; top-level so it can run in a worker process."""
+    path, parser = item
+    try:
+        with io.open(path, "r", encoding="utf-8", errors="ignore") as f:
+            src = f.read()
+        nodes, edges = parser(src, path)
+        return path, nodes, edges, None
+    except Exception as e:
+        return path, [], [], str(e)
+
+def build_graph_from_repo(repo_path: str, lang: str = "auto", workers: Optional[int] = None,
+                          max_bytes: Optional[int] = _MAX_FILE_BYTES) -> CodeGraph:
     G = CodeGraph()
-    for root, _, files in os.walk(repo_path):
-        for fn in files:
-            path = os.path.join(root, fn)
-            ext = os.path.splitext(fn)[1].lower()
-            if lang == "java" or (lang == "auto" and ext == ".java"):
-                try:
-                    with io.open(path, "r", encoding="utf-8", errors="ignore") as f:
-                        src = f.read()
-                    nodes, edges = parse_java_source_ts(src, path)
-                    for n in nodes: G.add_node(n)
-                    for e in edges: G.add_edge(e)
-                except Exception as e:
-                    file_id = f"file::{path}"
-                    G.add_node(Node(id=file_id, type=NodeType.FILE, name=fn, fqn=path, file=path, extras={"parse_error": str(e)}))
-            elif lang == "python" or (lang == "auto" and ext == ".py"):
-                try:
-                    with io.open(path, "r", encoding="utf-8", errors="ignore") as f:
-                        src = f.read()
-                    nodes, edges = parse_python_source(src, path)
-                    for n in nodes: G.add_node(n)
-                    for e in edges: G.add_edge(e)
-                except Exception as e:
-                    file_id = f"file::{path}"
-                    G.add_node(Node(id=file_id, type=NodeType.FILE, name=fn, fqn=path, file=path, extras={"parse_error": str(e)}))
+    plan = []   # (path, stamp, ready result or None) in walk order
+    todo = []   # (path, parser) still to parse
+    for path, parser, st in _iter_source_files(repo_path, lang):
+        stamp = (st.st_mtime_ns, st.st_size) if st is not None else None
+        if max_bytes is not None and st is not None and st.st_size > max_bytes:
+            plan.append((path, None, (path, [], [], "file too large")))
+            continue
+        hit = _PARSE_CACHE.get(path)
+        if hit is not None and hit[0] == stamp:
+            _PARSE_CACHE.move_to_end(path)
+            nodes, edges = pickle.loads(hit[1])
+            plan.append((path, None, (path, nodes, edges, None)))
+            continue
+        plan.append((path, stamp, None))
+        todo.append((path, parser))
+
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(todo) >= _PARALLEL_MIN_FILES:
+        # Each worker builds its own Tree-sitter parser up front; none is shared across processes.
+        with ProcessPoolExecutor(max_workers=workers, initializer=_worker_init) as ex:
+            _merge_parsed(G, _in_walk_order(plan, ex.map(_parse_file, todo, chunksize=32)))
+    else:
+        _merge_parsed(G, _in_walk_order(plan, map(_parse_file, todo)))
     derive_overrides(G)
     resolve_calls_java(G)
     return G
 
+def _in_walk_order(plan, parsed):
+    """Interleave cached/skipped results with freshly parsed ones, caching the latter."""
+    parsed = iter(parsed)
+    for path, stamp, ready in plan:
+        if ready is not None:
+            yield ready
+            continue
+        result = next(parsed)
+        if result[3] is None and stamp is not None:
+            _PARSE_CACHE[path] = (stamp, pickle.dumps((result[1], result[2]), pickle.HIGHEST_PROTOCOL))
+            _PARSE_CACHE.move_to_end(path)
+            if len(_PARSE_CACHE) > _PARSE_CACHE_MAX_FILES:
+                _PARSE_CACHE.popitem(last=False)
+        yield result
+
+def _merge_parsed(G: CodeGraph, results):
+    for path, nodes, edges, error in results:
+        if error is not None:
+            file_id = f"file::{path}"
+            G.add_node(Node(id=file_id, type=NodeType.FILE, name=os.path.basename(path), fqn=path, file=path, extras={"parse_error": error}))
+            continue
+        G.add_nodes_bulk(nodes)
+        G.add_edges_bulk(edges)
+
 def derive_overrides(G: CodeGraph):
-    supers = {}
-    for u, v, d in G.g.edges(data=True):
-        if d.get("type") == EdgeType.EXTENDS:
-            supers.setdefault(u, set()).add(v)
+    # Enum members bound once: attribute lookup on the enum class costs more
+    # than the comparison itself in these loops.
+    EXTENDS, CONTAINS, METHOD = EdgeType.EXTENDS, EdgeType.CONTAINS, NodeType.METHOD
+    # One pass over the edges buckets everything the hierarchy walk needs.
+    nodes = G._nodes
+    extends_out: Dict[str, List[str]] = {}
+    contains_methods: Dict[str, List[str]] = {}
+    for u, nbrs in G._out.items():
+        for v, keyed in nbrs.items():
+            for d in keyed.values():
+                t = d.get("type")
+                if t == EXTENDS:
+                    extends_out.setdefault(u, []).append(v)
+                elif t == CONTAINS and nodes[v].get("type") == METHOD:
+                    contains_methods.setdefault(u, []).append(v)
 
-    class_methods = {}
-    for nid, data in G.g.nodes(data=True):
-        if data.get("type") == NodeType.METHOD:
-            fqn = data.get("fqn") or ""
-            cls = fqn.rsplit(".", 1)[0] if "." in fqn else None
-            name = data.get("name")
-            arity = len(data.get("params", [])) if data.get("params") else 0
-            if cls:
-                class_methods.setdefault(cls, []).append((nid, name, arity))
+    method_meta: Dict[str, Tuple[str, int]] = {}
+    for nid, data in nodes.items():
+        if data.get("type") == METHOD:
+            params = data.get("params")
+            method_meta[nid] = (data.get("name"), len(params) if params else 0)
 
-    for cls, meths in class_methods.items():
-        cls_node_id = G.by_fqn.get(cls)
-        if not cls_node_id: 
+    # CONTAINS already maps each class node to its methods; no need to
+    # reconstruct the owner from the method fqn.
+    for cls_node_id, meths in contains_methods.items():
+        if cls_node_id not in extends_out:
             continue
-        seen = set()
-        queue = list(supers.get(cls_node_id, []))
-        while queue:
-            cur = queue.pop()
-            if cur in seen: 
+        # DFS over EXTENDS; the dict doubles as visited set and ordered result.
+        seen: Dict[str, None] = {}
+        stack = list(extends_out[cls_node_id])
+        while stack:
+            cur = stack.pop()
+            if cur in seen:
                 continue
-            seen.add(cur)
-            for _, sup, d in G.g.out_edges(cur, data=True):
-                if d.get("type") == EdgeType.EXTENDS and sup not in seen:
-                    queue.append(sup)
-
-        super_meths = []
-        for sn in seen:
-            for _, mn, d in G.g.out_edges(sn, data=True):
-                if d.get("type") == EdgeType.CONTAINS and G.g.nodes[mn].get("type") == NodeType.METHOD:
-                    mdata = G.g.nodes[mn]
-                    super_meths.append((mn, mdata.get("name"), len(mdata.get("params", [])) if mdata.get("params") else 0))
+            seen[cur] = None
+            stack.extend(extends_out.get(cur, ()))
 
         super_index = {}
-        for mn, name, ar in super_meths:
-            super_index.setdefault((name, ar), []).append(mn)
+        for sn in seen:
+            for mn in contains_methods.get(sn, ()):
+                super_index.setdefault(method_meta[mn], []).append(mn)
 
-        for nid, name, ar in meths:
-            for super_n in super_index.get((name, ar), []):
+        for nid in meths:
+            for super_n in super_index.get(method_meta[nid], []):
                 G.add_edge(Edge(src=nid, dst=super_n, type=EdgeType.OVERRIDES))
@@ -1,10 +1,17 @@
 
 from __future__ import annotations
-from dataclasses import dataclass, asdict
-from typing import Any, Dict, Iterable, List, Optional, Set
+from dataclasses import dataclass, fields
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 import networkx as nx
 from enum import Enum
+import itertools
+import operator
 import json
+import sys
+
+# Node/Edge instances are created per declaration and per reference; drop the
+# per-instance __dict__ where dataclasses support it (3.10+).
+_DC_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
 
 class NodeType(str, Enum):
     FILE = "file"
@@ -23,7 +30,7 @@ class EdgeType(str, Enum):
     ANNOTATED_BY = "annotated_by"
     IMPORTS = "imports"
 
-@dataclass
+@dataclass(**_DC_SLOTS)
 class Node:
     id: str
     type: NodeType
@@ -37,95 +44,350 @@ class Node:
     returns: Optional[str]=None
     extras: Optional[dict]=None
 
-@dataclass
+    def to_dict(self) -> Dict[str, Any]:
+        """All fields, like asdict(), but containers are shared rather than deep-copied."""
+        return {
+            "id": self.id, "type": self.type, "name": self.name, "fqn": self.fqn,
+            "file": self.file, "line": self.line, "modifiers": self.modifiers,
+            "annotations": self.annotations, "params": self.params,
+            "returns": self.returns, "extras": self.extras,
+        }
+
+    def _as_dict_shallow(self) -> Dict[str, Any]:
+        """Set (non-None) fields as a flat dict; unlike asdict(), containers are not copied."""
+        return {k: v for k, v in zip(_NODE_FIELDS, _node_values(self)) if v is not None}
+
+_NODE_FIELDS = tuple(f.name for f in fields(Node))
+# All field values in one call; reads the slot descriptors without a Python-level loop.
+_node_values = operator.attrgetter(*_NODE_FIELDS)
+
+@dataclass(**_DC_SLOTS)
 class Edge:
     src: str
     dst: str
     type: EdgeType
     extras: Optional[dict]=None
 
+    def to_dict(self) -> Dict[str, Any]:
+        """All fields, like asdict(), but extras is shared rather than deep-copied."""
+        return {"src": self.src, "dst": self.dst, "type": self.type, "extras": self.extras}
+
+# neighbors_k_hops results kept per graph
+_KHOP_CACHE_SIZE = 128
+
+# NetworkX >= 3.3 caches algorithm results on the graph and drops them through
+# this hook; the bulk writers below bypass add_*_from, so they call it
+# themselves. Older releases keep no such cache and have no hook.
+_clear_nx_cache = getattr(nx, "_clear_cache", None) or (lambda G: None)
+
 class CodeGraph:
     def __init__(self):
         self.g = nx.MultiDiGraph()
         self.by_fqn: Dict[str, str] = {}
+        # Native dict-of-dicts storage behind self.g (node -> attrs,
+        # src -> dst -> key -> edge data).  Internal hot paths read these
+        # directly instead of going through NetworkX's view objects.
+        self._nodes: Dict[str, dict] = self.g._node
+        self._out: Dict[str, Dict[str, Dict[int, dict]]] = self.g._succ
+        self._in: Dict[str, Dict[str, Dict[int, dict]]] = self.g._pred
+        # Simple name (last "." segment of fqn / name) -> node ids, so
+        # suffix lookups don't have to scan every node or edge.
+        self._name_index: Dict[str, Set[str]] = {}
+        # (annotation name -> ids, annotation text head -> ids, ids with an
+        # HTTP mapping, node type -> ids); built on first use by
+        # _anno_lookups(), dropped by any node write.
+        self._anno_cache: Optional[Tuple[Dict[str, Set[str]], Dict[str, Set[str]], Set[str], Dict[Any, Set[str]]]] = None
+        # Bumped by every add_* call so derived results (e.g. LLM packs) can
+        # be cached per graph; writes straight into self.g are not counted.
+        self.version = 0
+        # Same, for add_node()/add_nodes_bulk() only: caches of per-node
+        # data survive edge writes (e.g. call resolution).
+        self.node_version = 0
+        # (seed ids, k) -> neighbors_k_hops node set, valid for _khop_version
+        self._khop_cache: Dict[Tuple[frozenset, int], frozenset] = {}
+        self._khop_version = 0
+
+    def _index_names(self, nid: str, attrs: dict):
+        idx = self._name_index
+        for s in (attrs.get("fqn"), attrs.get("name")):
+            if s:
+                key = str(s).rpartition(".")[2]
+                ids = idx.get(key)
+                if ids is None:
+                    idx[key] = {nid}
+                else:
+                    ids.add(nid)
+
+    def _anno_lookups(self) -> Tuple[Dict[str, Set[str]], Dict[str, Set[str]], Set[str], Dict[Any, Set[str]]]:
+        cache = self._anno_cache
+        if cache is None:
+            by_name: Dict[str, Set[str]] = {}
+            by_head: Dict[str, Set[str]] = {}
+            http_ids: Set[str] = set()
+            by_type: Dict[Any, Set[str]] = {}
+            for nid, d in self._nodes.items():
+                by_type.setdefault(d.get("type"), set()).add(nid)
+                extras = d.get("extras") or {}
+                for a in d.get("annotations") or ():
+                    by_name.setdefault(a, set()).add(nid)
+                for t in extras.get("annotation_texts") or ():
+                    by_head.setdefault(t.split("(", 1)[0], set()).add(nid)
+                http = extras.get("http")
+                if http and (http.get("methods") or http.get("combined_paths")):
+                    http_ids.add(nid)
+            cache = self._anno_cache = (by_name, by_head, http_ids, by_type)
+        return cache
+
+    def ids_of_type(self, *types: NodeType) -> Set[str]:
+        """Ids of nodes of any of the given types."""
+        by_type = self._anno_lookups()[3]
+        return set().union(*(by_type.get(t, ()) for t in types))
+
+    def ids_with_annotation(self, names: Iterable[str]) -> Set[str]:
+        """Ids of nodes carrying any of the given annotation names, e.g. "@RestController"."""
+        by_name = self._anno_lookups()[0]
+        return set().union(*(by_name.get(a, ()) for a in names))
+
+    def ids_with_annotation_text_prefix(self, prefixes: Tuple[str, ...]) -> Set[str]:
+        """Ids of nodes with an annotation text starting with any of prefixes."""
+        out: Set[str] = set()
+        for head, ids in self._anno_lookups()[1].items():
+            # a text starts with a "(" free prefix iff its head does
+            if head.startswith(prefixes):
+                out |= ids
+        return out
+
+    def http_ids(self) -> Set[str]:
+        """Ids of nodes whose extras["http"] has methods or combined paths."""
+        return self._anno_lookups()[2]
+
+    def sources_into(self, ids: Iterable[str], etype: EdgeType) -> Set[str]:
+        """Ids with an etype edge into any of ids (reads only those nodes' in-edges)."""
+        inn = self._in
+        out: Set[str] = set()
+        for v in ids:
+            for u, keyed in inn.get(v, {}).items():
+                if u not in out and any(d.get("type") == etype for d in keyed.values()):
+                    out.add(u)
+        return out
+
+    def ids_by_name_suffix(self, suffix: str) -> Set[str]:
+        """Ids of nodes whose fqn or name ends with suffix (a simple name, no ".")."""
+        out: Set[str] = set()
+        for key, ids in self._name_index.items():
+            if key.endswith(suffix):
+                out |= ids
+        return out
 
     def add_node(self, n: Node):
-        if n.id not in self.g:
+        self.version += 1
+        self.node_version += 1
+        attrs = self._nodes.get(n.id)
+        if attrs is None:
             self.g.add_node(n.id)
-        data = asdict(n)
-        self.g.nodes[n.id].update({k:v for k,v in data.items() if v is not None})
+            attrs = self._nodes[n.id]
+        elif n.file is None and attrs.get("file") is not None:
+            # Reference placeholder (super type, interface) for a node already
+            # parsed from source: keep the real data.
+            return
+        attrs.update(n._as_dict_shallow())
+        self._index_names(n.id, attrs)
+        self._anno_cache = None
         if n.fqn:
             self.by_fqn[n.fqn] = n.id
 
     def add_edge(self, e: Edge):
+        self.version += 1
+        if e.src not in self._nodes or e.dst not in self._nodes:
+            self.node_version += 1  # endpoints get added as bare nodes
         self.g.add_edge(e.src, e.dst, type=e.type, extras=e.extras or {})
 
+    def add_nodes_bulk(self, ns: Iterable[Node]):
+        """add_node() for a batch, writing the adjacency dicts directly."""
+        self.version += 1
+        self.node_version += 1
+        nodes, succ, pred, by_fqn = self._nodes, self._out, self._in, self.by_fqn
+        index_names = self._index_names
+        for n in ns:
+            nid = n.id
+            attrs = nodes.get(nid)
+            if attrs is None:
+                if nid is None:
+                    raise ValueError("None cannot be a node")
+                succ[nid] = {}; pred[nid] = {}
+                attrs = nodes[nid] = {}
+            elif n.file is None and attrs.get("file") is not None:
+                continue
+            attrs.update(n._as_dict_shallow())
+            index_names(nid, attrs)
+            if n.fqn:
+                by_fqn[n.fqn] = nid
+        self._anno_cache = None
+        _clear_nx_cache(self.g)
+
+    def add_edges_bulk(self, es: Iterable[Edge]):
+        """add_edge() for a batch; keys are assigned exactly as MultiDiGraph.add_edge does."""
+        self.version += 1
+        nodes, succ, pred = self._nodes, self._out, self._in
+        for e in es:
+            u, v = e.src, e.dst
+            for n in (u, v):
+                if n not in succ:
+                    if n is None:
+                        raise ValueError("None cannot be a node")
+                    succ[n] = {}; pred[n] = {}; nodes[n] = {}
+                    self.node_version += 1
+            keydict = succ[u].get(v)
+            if keydict is None:
+                keydict = succ[u][v] = pred[v][u] = {}
+                key = 0
+            else:
+                key = len(keydict)
+                while key in keydict:
+                    key += 1
+            keydict[key] = {"type": e.type, "extras": e.extras or {}}
+        _clear_nx_cache(self.g)
+
+    def remove_nodes(self, ids: Iterable[str]):
+        """Drop nodes and their edges, along with their by_fqn / name index entries."""
+        nodes, idx, by_fqn = self._nodes, self._name_index, self.by_fqn
+        gone = [nid for nid in ids if nid in nodes]
+        if not gone:
+            return
+        self.version += 1
+        self.node_version += 1
+        for nid in gone:
+            attrs = nodes[nid]
+            fqn = attrs.get("fqn")
+            if fqn and by_fqn.get(fqn) == nid:
+                del by_fqn[fqn]
+            for s in (fqn, attrs.get("name")):
+                if s:
+                    key = str(s).rpartition(".")[2]
+                    named = idx.get(key)
+                    if named is not None:
+                        named.discard(nid)
+                        if not named:
+                            del idx[key]
+        self.g.remove_nodes_from(gone)
+        self._anno_cache = None
+
     def to_json(self) -> Dict[str, Any]:
         nodes = []
-        for nid, d in self.g.nodes(data=True):
+        for nid, d in self._nodes.items():
             out = dict(id=nid); out.update(d); nodes.append(out)
         edges = []
-        for u,v,k,d in self.g.edges(keys=True, data=True):
-            edges.append(dict(src=u, dst=v, type=d.get("type"), extras=d.get("extras", {})))
+        for u, nbrs in self._out.items():
+            for v, keyed in nbrs.items():
+                for d in keyed.values():
+                    edges.append(dict(src=u, dst=v, type=d.get("type"), extras=d.get("extras", {})))
         return {"nodes": nodes, "edges": edges}
 
     def subgraph_by_nodes(self, ids: Iterable[str]) -> "CodeGraph":
         sg_ids = set(ids)
         H = CodeGraph()
         for n in sg_ids:
-            if n in self.g:
-                H.add_node(Node(id=n, type=self.g.nodes[n].get("type"),
-                                name=self.g.nodes[n].get("name"),
-                                fqn=self.g.nodes[n].get("fqn"),
-                                file=self.g.nodes[n].get("file"),
-                                line=self.g.nodes[n].get("line"),
-                                modifiers=self.g.nodes[n].get("modifiers"),
-                                annotations=self.g.nodes[n].get("annotations"),
-                                params=self.g.nodes[n].get("params"),
-                                returns=self.g.nodes[n].get("returns"),
-                                extras=self.g.nodes[n].get("extras")))
-        for u,v,k,d in self.g.edges(keys=True, data=True):
-            if u in sg_ids and v in sg_ids:
-                H.add_edge(Edge(src=u, dst=v, type=d.get("type"), extras=d.get("extras", {})))
+            d = self._nodes.get(n)
+            if d is None:
+                continue
+            H.g.add_node(n)
+            attrs = H._nodes[n]
+            attrs["id"] = n
+            attrs.update(d)
+            H._index_names(n, attrs)
+            fqn = d.get("fqn")
+            if fqn:
+                H.by_fqn[fqn] = n
+        for u in sg_ids:
+            for v, keyed in self._out.get(u, {}).items():
+                if v in sg_ids:
+                    for d in keyed.values():
+                        H.g.add_edge(u, v, type=d.get("type"), extras=d.get("extras") or {})
         return H
 
     def neighbors_k_hops(self, seeds: Iterable[str], k: int=1) -> "CodeGraph":
-        keep: Set[str] = set()
-        frontier: Set[str] = set(seeds)
+        return self.subgraph_by_nodes(self._k_hop_ids(frozenset(seeds), k))
+
+    def _k_hop_ids(self, seeds: frozenset, k: int) -> frozenset:
+        """Node ids within k hops of seeds (either direction); cached per graph version."""
+        cache = self._khop_cache
+        if self._khop_version != self.version:
+            cache.clear()
+            self._khop_version = self.version
+        key = (seeds, k)
+        hit = cache.get(key)
+        if hit is not None:
+            return hit
+        keep: Set[str] = set(seeds)
+        out, inn = self._out, self._in
+        # every later frontier holds only graph nodes; seeds may not
+        frontier = [n for n in seeds if n in out]
+        succ, pred = out.__getitem__, inn.__getitem__
         for _ in range(max(0, k)):
-            next_frontier: Set[str] = set()
-            for n in frontier:
-                keep.add(n)
-                for _, v, _ in self.g.out_edges(n, keys=True):
-                    keep.add(v); next_frontier.add(v)
-                for u, _, _ in self.g.in_edges(n, keys=True):
-                    keep.add(u); next_frontier.add(u)
+            # one C-level union of the frontier's adjacency keys per hop
+            next_frontier = set().union(*map(succ, frontier), *map(pred, frontier))
+            # nodes already kept were expanded (or queued) before
+            next_frontier -= keep
+            keep |= next_frontier
             frontier = next_frontier
-        keep |= set(seeds)
-        return self.subgraph_by_nodes(keep)
+            if not frontier:
+                break
+        if len(cache) >= _KHOP_CACHE_SIZE:
+            del cache[next(iter(cache))]  # oldest entry
+        hit = cache[key] = frozenset(keep)
+        return hit
     
-    def export_json(self, path: str):
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(self.to_json(), f, indent=2)
+    def export_json(self, path: str, indent: Optional[int] = None):
+        """Stream the to_json() layout to path one node/edge at a time.
+
+        Output is compact by default; pass indent for the pretty-printed form.
+        """
+        if indent is None:
+            dumps = lambda o: json.dumps(o, default=str, ensure_ascii=False, separators=(",", ":"))
+            sep = ","
+        else:
+            dumps = lambda o: json.dumps(o, default=str, ensure_ascii=False, indent=indent)
+            sep = ",\n"
+        with open(path, "w", encoding="utf-8", buffering=8 << 20) as f:
+            f.write('{"nodes":[')
+            first = True
+            for nid, d in self._nodes.items():
+                out = dict(id=nid); out.update(d)
+                if not first: f.write(sep)
+                f.write(dumps(out))
+                first = False
+            f.write('],"edges":[')
+            first = True
+            for u, nbrs in self._out.items():
+                for v, keyed in nbrs.items():
+                    for d in keyed.values():
+                        if not first: f.write(sep)
+                        f.write(dumps(dict(src=u, dst=v, type=d.get("type"), extras=d.get("extras", {}))))
+                        first = False
+            f.write("]}")
 
     def export_graphml(self, path: str):
         nx.write_graphml(self.g, path)
 
     def export_mermaid(self, path: str, node_limit: int = 200):
-        lines = ["flowchart LR"]
-        nodes = list(self.g.nodes)[:node_limit]
+        nodes = list(itertools.islice(self._nodes, node_limit))
         node_set = set(nodes)
-        for n in nodes:
-            data = self.g.nodes[n]
-            label = (data.get("name", n) or "").replace('"', "'")
-            lines.append(f'  {n}["{label}\\n({data.get("type")})"]')
-        count = 0
-        for u, v, d in self.g.edges(data=True):
-            if u in node_set and v in node_set:
-                et = d.get("type", "EDGE")
-                lines.append(f"  {u} -->|{et}| {v}")
-                count += 1
-                if count > 800:
-                    break
         with open(path, "w", encoding="utf-8") as f:
-            f.write("\n".join(lines))
+            f.write("flowchart LR")
+            for n in nodes:
+                data = self._nodes[n]
+                label = (data.get("name", n) or "").replace('"', "'")
+                f.write(f'\n  {n}["{label}\\n({data.get("type")})"]')
+            # Only the kept nodes' out-edges can qualify; walking them in node
+            # order matches the order of a full edge scan.
+            count = 0
+            for u in nodes:
+                for v, keyed in self._out[u].items():
+                    if v not in node_set:
+                        continue
+                    for d in keyed.values():
+                        et = d.get("type", "EDGE")
+                        f.write(f"\n  {u} -->|{et}| {v}")
+                        count += 1
+                        if count > 800:
+                            return
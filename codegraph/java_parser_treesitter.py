@@ -1,9 +1,13 @@
 from __future__ import annotations
-from typing import List, Tuple, Dict, Any, Optional
+import itertools
+import sys
+import threading
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 # Tree-sitter 0.25+ bindings
 import tree_sitter_java as tsjava
-from tree_sitter import Language, Parser
+from tree_sitter import Language, Parser, Query, QueryCursor
 
 from .graph_schema import Node, Edge, NodeType, EdgeType
 
@@ -17,8 +21,61 @@ print(f"[CodeGraph] Loaded {SIGNATURE}")
 # Language & Parser (single, supported path for 0.25+)
 # ============================================================
 JAVA_LANGUAGE = Language(tsjava.language())
-_PARSER = Parser(JAVA_LANGUAGE)
-# _PARSER.set_language(JAVA_LANGUAGE)
+
+# A Parser holds per-parse state and must not be shared between threads;
+# each thread builds one on first use and reuses it for every file after.
+_TLS = threading.local()
+
+def _get_parser() -> Parser:
+    p = getattr(_TLS, "parser", None)
+    if p is None:
+        p = _TLS.parser = Parser(JAVA_LANGUAGE)
+    return p
+
+def _worker_init() -> None:
+    """ProcessPoolExecutor initializer: build the worker's parser before its first file arrives."""
+    _get_parser()
+
+# Compiled once; matching runs in the Tree-sitter core instead of Python child loops.
+_Q_FORMAL_PARAMS = Query(JAVA_LANGUAGE, "(formal_parameters [(formal_parameter) (receiver_parameter)] @param)")
+
+_Q_CALLS = Query(JAVA_LANGUAGE, "(method_invocation) @call")
+
+def _cursors() -> Tuple[QueryCursor, QueryCursor]:
+    """This thread's (formal params, calls) cursors; a cursor is reusable but not thread-safe."""
+    cs = getattr(_TLS, "cursors", None)
+    if cs is None:
+        params_qc = QueryCursor(_Q_FORMAL_PARAMS)
+        params_qc.set_max_start_depth(0)  # this list only, not lambdas/anonymous classes below it
+        cs = _TLS.cursors = (params_qc, QueryCursor(_Q_CALLS))
+    return cs
+
+def _formal_params(formals) -> list:
+    """Parameter nodes of a formal_parameters node, in source order."""
+    params = _cursors()[0].captures(formals).get("param", [])
+    if len(params) > 1:
+        # alternation captures come back grouped by branch, not by position
+        params.sort(key=lambda n: n.start_byte)
+    return params
+
+def _call_sites(node) -> list:
+    """method_invocation nodes under node in pre-order (outer call of a chain first)."""
+    sites = _cursors()[1].captures(node).get("call", [])
+    # captures sharing a start byte (a.b().c()) come back inner-first
+    sites.sort(key=lambda n: (n.start_byte, -n.end_byte))
+    return sites
+
+# Node kinds tested per child in the walks below (hash lookups, not tuple scans)
+_TYPE_NODE_KINDS = frozenset({
+    "type_identifier", "integral_type", "floating_point_type", "boolean_type",
+    "scoped_type_identifier", "generic_type", "array_type", "qualified_name",
+})
+_ANNO_KINDS = frozenset({"annotation", "marker_annotation"})
+_TYPE_DECL_KINDS = frozenset({"class_declaration", "interface_declaration", "enum_declaration"})
+_QUALIFIER_KINDS = frozenset({"identifier", "field_access", "scoped_identifier"})
+_NAME_KINDS = frozenset({"identifier", "scoped_identifier", "qualified_name"})
+_SUPER_NAME_KINDS = frozenset({"type_identifier", "scoped_type_identifier", "qualified_name", "identifier"})
+_EXTENDS_KINDS = frozenset({"superclass", "extends_interfaces"})
 
 # ============================================================
 # HTTP mapping registry (centralized)
@@ -36,23 +93,113 @@ _REQUEST_METHOD_PREFIX = "RequestMethod."
 # Utilities
 # ============================================================
 
+# Node-id prefixes; ids are interned so graph dict lookups can short-circuit on identity.
+_ID_JAVA, _ID_FILE, _ID_ANNO, _ID_IMPORT = "java::", "file::", "anno::", "import::"
+
+def _jid(fqn: str) -> str:
+    return sys.intern(_ID_JAVA + fqn)
+
 def _text(src: bytes, node) -> str:
     return src[node.start_byte:node.end_byte].decode("utf-8")
 
+# Identifiers, keywords and type names recur across every file (value, path,
+# GET, String, public, ...); decode each distinct spelling once and share it.
+_IDENT_CACHE: Dict[bytes, str] = {}
+_IDENT_CACHE_MAX = 1 << 16
+
+def _text_ident(src: bytes, node) -> str:
+    k = src[node.start_byte:node.end_byte]
+    r = _IDENT_CACHE.get(k)
+    if r is None:
+        if len(_IDENT_CACHE) >= _IDENT_CACHE_MAX:
+            _IDENT_CACHE.clear()
+        r = _IDENT_CACHE[k] = sys.intern(k.decode("utf-8"))
+    return r
+
+def _super_type_names(src: bytes, clause) -> List[str]:
+    """Type names in a superclass / super_interfaces / extends_interfaces clause, type arguments dropped."""
+    out: List[str] = []
+    for si in clause.named_children:
+        if si.type == "type_list":
+            out.extend(_super_type_names(src, si))
+        elif si.type == "generic_type":
+            if si.named_children:
+                out.append(_text_ident(src, si.named_children[0]))
+        elif si.type in _SUPER_NAME_KINDS:
+            out.append(_text_ident(src, si))
+    return out
+
+def _split_modifiers(src: bytes, decl) -> Tuple[List[str], list]:
+    """(keyword modifiers, annotation nodes) of a declaration, in source order.
+
+    modifiers is not a grammar field, but when present it is always the
+    declaration's first child, so no scan over the children is needed.
+    """
+    keywords: List[str] = []
+    annos: list = []
+    mods = decl.child(0)
+    if mods is not None and mods.type == "modifiers":
+        for m in mods.children:
+            if m.type in _ANNO_KINDS:
+                annos.append(m)
+            else:
+                keywords.append(_text_ident(src, m))
+    return keywords, annos
+
+def _param_name_type(src: bytes, p) -> Tuple[Optional[str], Optional[str]]:
+    """(name, type) of a formal_parameter, or of a receiver_parameter (which has no fields)."""
+    if p.type == "formal_parameter":
+        n, t = p.child_by_field_name("name"), p.child_by_field_name("type")
+        return (_text_ident(src, n) if n is not None else None,
+                _text_ident(src, t) if t is not None else None)
+    pname, ptype = None, None
+    for ch in p.children:
+        if ch.type in ("variable_declarator_id", "identifier"):
+            pname = _text(src, ch).split("[", 1)[0]
+        elif ch.type in _TYPE_NODE_KINDS:
+            ptype = _text_ident(src, ch)
+    return pname, ptype
+
 def _dedup(xs: List[str]) -> List[str]:
-    return [x for x in dict.fromkeys(xs) if str(x).strip() != ""]
+    """Order-preserving unique values, dropping blanks (one pass)."""
+    out: List[str] = []
+    if not xs:
+        return out
+    if len(xs) == 1:
+        # by far the common case (one path, one media type): nothing to dedupe
+        x = xs[0]
+        if (x.strip() if type(x) is str else str(x).strip()):
+            out.append(x)
+        return out
+    seen = set()
+    mark, add = seen.add, out.append
+    for x in xs:
+        if x in seen:
+            continue
+        mark(x)
+        # values are almost always str; anything else (e.g. None) keeps the str() check
+        if (x.strip() if type(x) is str else str(x).strip()):
+            add(x)
+    return out
 
+# Class-level base paths repeat for every handler method of a controller.
+@lru_cache(maxsize=8192)
 def _join_paths(base: str, leaf: str) -> str:
-    if not base and not leaf: return "/"
-    if not base: return leaf if leaf.startswith("/") else f"/{leaf}"
+    if not base: return "/" if not leaf else (leaf if leaf[0] == "/" else "/" + leaf)
     if not leaf: return base
-    if base.endswith("/") and leaf.startswith("/"): return base[:-1] + leaf
-    if not base.endswith("/") and not leaf.startswith("/"): return base + "/" + leaf
+    # each boundary character is looked at once
+    b_slash, l_slash = base[-1] == "/", leaf[0] == "/"
+    if b_slash and l_slash: return base[:-1] + leaf
+    if not b_slash and not l_slash: return base + "/" + leaf
     return base + leaf
 
 def _combine_paths(base_paths: List[str], method_paths: List[str]) -> List[str]:
+    # The usual controller shape: one class path, one method path. Both come
+    # out of _dedup (non-blank), so the join is non-blank and needs no dedup.
+    if len(base_paths) == 1 and len(method_paths) == 1:
+        return [_join_paths(base_paths[0], method_paths[0])]
     if base_paths and method_paths:
-        out = [_join_paths(b, m) for b in base_paths for m in method_paths]
+        out = list(itertools.starmap(_join_paths, itertools.product(base_paths, method_paths)))
     elif method_paths:
         out = method_paths
     elif base_paths:
@@ -65,44 +212,49 @@ def _combine_paths(base_paths: List[str], method_paths: List[str]) -> List[str]:
 # Annotation extraction (CST → our arg dict; pure TS, no regex)
 # ============================================================
 
-def _string_lit_to_py(s: str) -> str:
-    s = s.strip()
-    if (len(s) >= 2) and ((s[0] == s[-1] == '"') or (s[0] == s[-1] == "'")):
-        return s[1:-1]
-    return s
+_QUOTES = frozenset("\"'")
 
-def _elem_value_to_list(src: bytes, node) -> List[str]:
-    """
-    Collect string/identifier-ish values from an annotation element subtree.
-    Covers: string_literal, arrays, identifiers, field_access (e.g., RequestMethod.GET),
-    and walks through wrapper nodes like expression/conditional_expression/primary.
-    """
-    t = node.type
-
-    # Direct string: "…"
-    if t == "string_literal":
-        return [_string_lit_to_py(_text(src, node))]
-
-    # Array initializer: { "a", "b" }
-    if t == "element_value_array_initializer":
-        vals: List[str] = []
-        for ch in node.children:
-            vals.extend(_elem_value_to_list(src, ch))
-        return _dedup(vals)
-
-    # Literals/booleans (leave raw)
-    if t in (
-        "character_literal", "decimal_integer_literal", "decimal_floating_point_literal",
-        "true", "false", "null_literal"
-    ):
-        return [_text(src, node)]
+def _ev_string(src: bytes, node) -> List[str]:
+    # Direct string: "…" (or 'c')
+    v = _text(src, node).strip()
+    n = len(v)
+    k = 1 if n >= 2 and v[0] in _QUOTES and v[-1] == v[0] else 0
+    return [v[k:n - k]]
+
+def _ev_raw(src: bytes, node) -> List[str]:
+    # Literals/booleans (leave raw); true/false/0/1 recur, so share the decode
+    return [_text_ident(src, node)]
 
+def _ev_name(src: bytes, node) -> List[str]:
     # Names/enums like RequestMethod.GET or identifiers
-    if t in ("field_access", "identifier", "scoped_identifier", "qualified_name"):
-        return [_text(src, node)]
+    return [_text_ident(src, node)]
+
+def _ev_children(src: bytes, node) -> List[str]:
+    # Array initializers ({ "a", "b" }) and wrappers we just recurse through;
+    # named children only, so "{", ",", "}" never show up as values. Not
+    # deduplicated here: _parse_annotation_args dedups each value once.
+    out: List[str] = []
+    for ch in node.named_children:
+        out.extend(_elem_value_to_list(src, ch))
+    return out
+
+def _ev_default(src: bytes, node) -> List[str]:
+    # Recurse into children; if nothing found, fall back to raw text
+    collected: List[str] = []
+    for ch in node.named_children:
+        collected.extend(_elem_value_to_list(src, ch))
+    return _dedup(collected) if collected else [_text(src, node)]
 
-    # Common wrappers we should just recurse through
-    if t in (
+_ELEM_DISPATCH: Dict[str, Callable[[bytes, Any], List[str]]] = {
+    "string_literal": _ev_string,
+    "character_literal": _ev_string,
+    "element_value_array_initializer": _ev_children,
+    **dict.fromkeys((
+        "decimal_integer_literal", "decimal_floating_point_literal",
+        "true", "false", "null_literal",
+    ), _ev_raw),
+    **dict.fromkeys(("field_access", "identifier", "scoped_identifier", "qualified_name"), _ev_name),
+    **dict.fromkeys((
         "element_value",
         "conditional_expression",
         "expression",
@@ -111,17 +263,16 @@ def _elem_value_to_list(src: bytes, node) -> List[str]:
         "argument_list",
         "annotation_argument_list",
         "element_value_pair_list",
-    ):
-        out: List[str] = []
-        for ch in node.children:
-            out.extend(_elem_value_to_list(src, ch))
-        return _dedup(out)
+    ), _ev_children),
+}
 
-    # Default: recurse into children; if nothing found, fall back to raw text
-    collected: List[str] = []
-    for ch in node.children:
-        collected.extend(_elem_value_to_list(src, ch))
-    return _dedup(collected) if collected else [_text(src, node)]
+def _elem_value_to_list(src: bytes, node) -> List[str]:
+    """
+    Collect string/identifier-ish values from an annotation element subtree.
+    Covers: string_literal, arrays, identifiers, field_access (e.g., RequestMethod.GET),
+    and walks through wrapper nodes like expression/conditional_expression/primary.
+    """
+    return _ELEM_DISPATCH.get(node.type, _ev_default)(src, node)
 
 
 def _parse_annotation_args(src: bytes, anno_node) -> Dict[str, Any]:
@@ -133,44 +284,29 @@ def _parse_annotation_args(src: bytes, anno_node) -> Dict[str, Any]:
     """
     out: Dict[str, Any] = {}
 
-    # Locate the annotation argument list
-    arg_list = None
-    for ch in anno_node.children:
-        if ch.type in ("annotation_argument_list", "argument_list"):
-            arg_list = ch
-            break
+    arg_list = anno_node.child_by_field_name("arguments")
     if arg_list is None:
         return out  # marker annotation: no args
 
+    # Pairs and the unnamed value are direct children of the argument list
+    # (the grammar has no element_value wrapper node); anything deeper belongs
+    # to a nested annotation.
     pair_nodes, single_values = [], []
-
-    # Deep walker: collect pair nodes and single element_value nodes
-    def _collect(n):
-        if n.type == "element_value_pair":
-            pair_nodes.append(n)
-        elif n.type == "element_value":
-            single_values.append(n)
-        # Recurse through everything (don’t miss nested wrappers)
-        for c in n.children:
-            _collect(c)
-
-    _collect(arg_list)
+    for c in arg_list.named_children:
+        if c.type == "element_value_pair":
+            pair_nodes.append(c)
+        else:
+            single_values.append(c)
 
     # Prefer pairs if present (NormalAnnotation semantics)
     if pair_nodes:
         for p in pair_nodes:
-            key_node, val_node, seen_eq = None, None, False
-            for ch in p.children:
-                if not seen_eq and ch.type == "identifier":
-                    key_node = ch
-                elif ch.type == "=":
-                    seen_eq = True
-                elif seen_eq and val_node is None:
-                    val_node = ch
+            key_node = p.child_by_field_name("key")
+            val_node = p.child_by_field_name("value")
             if key_node is None or val_node is None:
                 continue
-            k = _text(src, key_node)
-            vs = _elem_value_to_list(src, val_node)
+            k = _text_ident(src, key_node)
+            vs = _dedup(_elem_value_to_list(src, val_node))
             out[f"{k}_list"] = vs
             if vs:
                 out[k] = vs[0] if len(vs) == 1 else ",".join(vs)
@@ -187,25 +323,48 @@ def _parse_annotation_args(src: bytes, anno_node) -> Dict[str, Any]:
     return out
 
 
-def _annotation_to_record(src: bytes, anno_node) -> Dict[str, Any]:
-    name_ident_parts: List[str] = []
-    args: Dict[str, Any] = {}
-
-    after_at = False
-    for ch in anno_node.children:
-        if ch.type == "@":
-            after_at = True
-            continue
-        if not after_at:
-            continue
-        if ch.type in ("identifier", "scoped_identifier", "qualified_name"):
-            name_ident_parts.append(_text(src, ch))
-        if ch.type == "annotation_argument_list":
-            args = _parse_annotation_args(src, anno_node)
-            break
-
-    name = "@" + ("".join(name_ident_parts).strip() or _text(src, anno_node).split("(")[0].strip().lstrip("@"))
-
+# (name, full text, args) of one annotation, e.g. ("@GetMapping", '@GetMapping(/x)', {...})
+AnnoTriple = Tuple[str, str, Dict[str, Any]]
+
+# Annotation source text -> parsed triple. The triple depends only on the
+# annotation's own text, and texts like @GetMapping("/x") or
+# @RequestMapping(produces = ...) repeat across a repo. Callers must treat
+# cached args as read-only.
+_ANNO_CACHE: Dict[bytes, AnnoTriple] = {}
+_ANNO_CACHE_MAX = 1 << 16
+
+def _annotation_to_triple(src: bytes, anno_node) -> AnnoTriple:
+    key = src[anno_node.start_byte:anno_node.end_byte]
+    rec = _ANNO_CACHE.get(key)
+    if rec is None:
+        if len(_ANNO_CACHE) >= _ANNO_CACHE_MAX:
+            _ANNO_CACHE.clear()
+        rec = _ANNO_CACHE[key] = _build_annotation_triple(src, anno_node)
+    return rec
+
+def _annotation_lists(src: bytes, anno_nodes) -> Tuple[List[AnnoTriple], List[str], List[str], List[Dict[str, Any]]]:
+    """(triples, names, texts, args) for a declaration's annotations, in one pass."""
+    triples: List[AnnoTriple] = []
+    names: List[str] = []
+    texts: List[str] = []
+    argss: List[Dict[str, Any]] = []
+    for a in anno_nodes:
+        t = _annotation_to_triple(src, a)
+        triples.append(t)
+        names.append(t[0]); texts.append(t[1]); argss.append(t[2])
+    return triples, names, texts, argss
+
+def _build_annotation_triple(src: bytes, anno_node) -> AnnoTriple:
+    name_node = anno_node.child_by_field_name("name")
+    ident = _text_ident(src, name_node).strip() if name_node is not None else ""
+    name = "@" + (ident or _text(src, anno_node).split("(")[0].strip().lstrip("@"))
+
+    # @Override, @Autowired, ...: no argument list by grammar
+    if anno_node.type == "marker_annotation":
+        name = sys.intern(name)
+        return (name, name, {})
+
+    args = _parse_annotation_args(src, anno_node)
     full = name
     if args:
         parts = []
@@ -220,59 +379,126 @@ def _annotation_to_record(src: bytes, anno_node) -> Dict[str, Any]:
         if parts:
             full = f"{name}({', '.join(parts)})"
 
-    return {"name": name, "full": full, "args": args}
+    return (sys.intern(name), sys.intern(full), args)
 
 # ============================================================
 # HTTP extraction (consumes *_list args)
 # ============================================================
 
-def _extract_http_basic(anno_ds: List[Dict[str, Any]]) -> Dict[str, Any]:
-    methods: List[str] = []
-    paths: List[str] = []
-    consumes: List[str] = []
-    produces: List[str] = []
-    params: List[str] = []
-    headers: List[str] = []
-    name: Optional[str] = None
-
-    for d in anno_ds:
-        nm, args = d["name"], (d.get("args") or {})
-
-        if nm in _HTTP_MAP:
-            methods.append(_HTTP_MAP[nm])
-            for key in ("value_list", "path_list"):
-                if args.get(key):
-                    paths.extend(args[key])
-            if args.get("consumes_list"): consumes.extend(args["consumes_list"])
-            if args.get("produces_list"): produces.extend(args["produces_list"])
-            if args.get("params_list"):   params.extend(args["params_list"])
-            if args.get("headers_list"):  headers.extend(args["headers_list"])
-            if args.get("name"):          name = args["name"]
-
-        if nm == "@RequestMapping":
-            mlist = args.get("method_list") or []
-            for item in mlist:
-                if item.startswith(_REQUEST_METHOD_PREFIX):
-                    methods.append(item[len(_REQUEST_METHOD_PREFIX):])
-            for key in ("value_list", "path_list"):
-                if args.get(key):
-                    paths.extend(args[key])
-            if args.get("consumes_list"): consumes.extend(args["consumes_list"])
-            if args.get("produces_list"): produces.extend(args["produces_list"])
-            if args.get("params_list"):   params.extend(args["params_list"])
-            if args.get("headers_list"):  headers.extend(args["headers_list"])
-            if args.get("name"):          name = args["name"]
+# (annotation arg key, accumulator key); value= and path= are aliases
+_HTTP_LIST_KEYS = (
+    ("value_list", "paths"),
+    ("path_list", "paths"),
+    ("consumes_list", "consumes"),
+    ("produces_list", "produces"),
+    ("params_list", "params"),
+    ("headers_list", "headers"),
+)
+
+def _http_common(args: Dict[str, Any], acc: Dict[str, Any]) -> None:
+    """Attributes shared by @RequestMapping and its shortcut annotations."""
+    get = args.get
+    for arg_key, acc_key in _HTTP_LIST_KEYS:
+        v = get(arg_key)
+        if v:
+            acc[acc_key].extend(v)
+    if get("name"):
+        acc["name"] = args["name"]
+
+def _http_shortcut(verb: str) -> Callable[[Dict[str, Any], Dict[str, Any]], None]:
+    def handler(args: Dict[str, Any], acc: Dict[str, Any]) -> None:
+        acc["methods"].append(verb)
+        _http_common(args, acc)
+    return handler
+
+def _http_request_mapping(args: Dict[str, Any], acc: Dict[str, Any]) -> None:
+    for item in args.get("method_list") or []:
+        verb = item.removeprefix(_REQUEST_METHOD_PREFIX)
+        if verb is not item:
+            acc["methods"].append(sys.intern(verb))
+    _http_common(args, acc)
+
+# Annotation name -> handler folding its args into the accumulator
+_HTTP_HANDLERS: Dict[str, Callable[[Dict[str, Any], Dict[str, Any]], None]] = {
+    nm: _http_shortcut(verb) for nm, verb in _HTTP_MAP.items()
+}
+_HTTP_HANDLERS["@RequestMapping"] = _http_request_mapping
+_HTTP_SET = frozenset(_HTTP_HANDLERS)
 
+def _empty_http() -> Dict[str, Any]:
+    # A new dict (and lists) per call: the result ends up in node attrs.
     return {
-        "methods":  _dedup(methods),
-        "paths":    _dedup(paths),
-        "consumes": _dedup(consumes),
-        "produces": _dedup(produces),
-        "params":   _dedup(params),
-        "headers":  _dedup(headers),
-        "name": name,
+        "methods": [], "paths": [], "consumes": [], "produces": [],
+        "params": [], "headers": [], "name": None,
     }
 
+def _extract_http_basic(annos: List[AnnoTriple]) -> Dict[str, Any]:
+    if _HTTP_SET.isdisjoint(t[0] for t in annos):
+        return _empty_http()
+    acc = _empty_http()
+    get_handler = _HTTP_HANDLERS.get
+    for name, _, args in annos:
+        h = get_handler(name)
+        if h is not None:
+            h(args or {}, acc)
+
+    return {
+        "methods":  _dedup(acc["methods"]),
+        "paths":    _dedup(acc["paths"]),
+        "consumes": _dedup(acc["consumes"]),
+        "produces": _dedup(acc["produces"]),
+        "params":   _dedup(acc["params"]),
+        "headers":  _dedup(acc["headers"]),
+        "name": acc["name"],
+    }
+
+def _path_vars_in(path_vars: List[str], paths: List[str]) -> List[str]:
+    """Path variables that appear as {name} in any of paths."""
+    # One joined haystack: a NUL never occurs in a name, so no false match spans two paths
+    hay = (paths[0] or "") if len(paths) == 1 else "\0".join(p for p in paths if p)
+    return [pv for pv in path_vars if "{" + pv + "}" in hay]
+
+def _merge_dedup(a: Tuple[str, ...], b: Optional[List[str]]) -> List[str]:
+    """Values of a followed by the new ones from b.
+
+    Both inputs come out of _dedup (blanks gone, no repeats), so only the
+    cross-duplicates need filtering and no combined list is built.
+    """
+    out = list(a)
+    if b:
+        seen = set(a)
+        for x in b:
+            if x not in seen:
+                seen.add(x)
+                out.append(x)
+    return out
+
+# ============================================================
+# Response status & CORS
+# ============================================================
+
+def _extract_response_status(annos: List[AnnoTriple]) -> Optional[str]:
+    for name, _, args in annos:
+        if name == "@ResponseStatus":
+            args = args or {}
+            # Could be 'value' or 'code' (enum like HttpStatus.OK)
+            return args.get("value") or args.get("code")
+    return None
+
+def _extract_cors(annos: List[AnnoTriple]) -> Optional[Dict[str, Any]]:
+    for name, _, args in annos:
+        if name == "@CrossOrigin":
+            args = args or {}
+            cors: Dict[str, Any] = {}
+            for k in ("origins", "allowedHeaders", "exposedHeaders", "methods", "maxAge", "allowCredentials"):
+                list_key = f"{k}_list"
+                if args.get(list_key):
+                    cors[k] = args[list_key]
+                elif args.get(k):
+                    cors[k] = [args[k]] if k != "maxAge" else args[k]
+            return cors or None
+    return None
+
 # ============================================================
 # Param sources & extras
 # ============================================================
@@ -281,12 +507,7 @@ def _extract_param_sources_ts(src: bytes, method_node) -> Dict[str, Any]:
     param_sources = []
     path_vars, query_params, header_params, body_params, cookie_params = [], [], [], [], []
 
-    formals = None
-    for ch in method_node.children:
-        if ch.type == "formal_parameters":
-            formals = ch
-            break
-
+    formals = method_node.child_by_field_name("parameters")
     if formals is None:
         return {
             "param_sources": [],
@@ -294,24 +515,18 @@ def _extract_param_sources_ts(src: bytes, method_node) -> Dict[str, Any]:
             "body_params": [], "cookie_params": []
         }
 
-    for idx, p in enumerate([c for c in formals.children if c.type in ("formal_parameter", "receiver_parameter")]):
-        pname, ptype, annos = None, None, []
-        for ch in p.children:
-            if ch.type in ("variable_declarator_id", "identifier"):
-                pname = _text(src, ch).split("[", 1)[0]
-            elif ch.type in ("type_identifier", "integral_type", "floating_point_type", "boolean_type",
-                             "scoped_type_identifier", "generic_type", "array_type", "qualified_name"):
-                ptype = _text(src, ch)
-            elif ch.type == "modifiers":
-                for m in ch.children:
-                    if m.type in ("annotation", "marker_annotation"):
-                        annos.append(m)
+    name_type, to_triple = _param_name_type, _annotation_to_triple
+    for idx, p in enumerate(_formal_params(formals)):
+        pname, ptype = name_type(src, p)
+        # modifiers is not a grammar field, but always leads the parameter
+        first = p.child(0)
+        annos = ([m for m in first.children if m.type in _ANNO_KINDS]
+                 if first is not None and first.type == "modifiers" else ())
 
         info = {"index": idx, "name": pname, "type": ptype, "source": "unknown", "required": None, "default": None}
 
         for a in annos:
-            rec = _annotation_to_record(src, a)
-            nm, args = rec["name"], rec["args"]
+            nm, _, args = to_triple(src, a)
             if nm == "@PathVariable":
                 lst = args.get("value_list") or args.get("name_list") or []
                 var = lst[0] if lst else (args.get("value") or args.get("name") or pname)
@@ -363,60 +578,87 @@ def _extract_param_sources_ts(src: bytes, method_node) -> Dict[str, Any]:
 # Main parser (Tree-sitter)
 # ============================================================
 
-def parse_java_source_ts(src: str, path: str) -> Tuple[List[Node], List[Edge]]:
+def parse_java_source_ts(src: str, path: str, http_only: bool = False) -> Tuple[List[Node], List[Edge]]:
+    """Parse one Java file into graph nodes/edges.
+
+    http_only=True is for callers that only need the REST surface: types with
+    no class-level mapping and no "Mapping" annotation anywhere in their body
+    are emitted without fields, methods or call edges.
+    """
     source_bytes = src.encode("utf-8")
-    tree = _PARSER.parse(source_bytes)
+    # Every node of the file carries this path; one interned object is
+    # shared by all of them (and by cached re-parses of the same file).
+    path = sys.intern(path)
+    tree = _get_parser().parse(source_bytes)
     root = tree.root_node
 
     nodes: List[Node] = []
     edges: List[Edge] = []
-
-    file_id = f"file::{path}"
-    nodes.append(Node(id=file_id, type=NodeType.FILE, name=path.split("/")[-1], fqn=path, file=path))
+    # Bound once: the loops below run per member and per call site, where
+    # attribute and global lookups cost more than the work they guard.
+    add_node, add_edge = nodes.append, edges.append
+    text, text_ident, jid = _text, _text_ident, _jid
+    CLASS, INTERFACE, METHOD = NodeType.CLASS, NodeType.INTERFACE, NodeType.METHOD
+    CONTAINS, EXTENDS, IMPLEMENTS, CALLS = EdgeType.CONTAINS, EdgeType.EXTENDS, EdgeType.IMPLEMENTS, EdgeType.CALLS
+    ANNOTATED_BY, IMPORTS = EdgeType.ANNOTATED_BY, EdgeType.IMPORTS
+    intern = sys.intern
+
+    file_id = sys.intern(_ID_FILE + path)
+    add_node(Node(id=file_id, type=NodeType.FILE, name=path.split("/")[-1], fqn=path, file=path))
 
     # Package & imports (best-effort)
     package_name: Optional[str] = None
     imports: List[str] = []
+    type_decls = []
 
+    # One pass over the top level; package and imports precede the types.
     for ch in root.children:
-        if ch.type == "package_declaration":
+        t = ch.type
+        if t in _TYPE_DECL_KINDS:
+            type_decls.append(ch)
+        elif t == "package_declaration":
             for c2 in ch.children:
-                if c2.type in ("scoped_identifier", "identifier", "qualified_name"):
-                    package_name = _text(source_bytes, c2)
+                if c2.type in _NAME_KINDS:
+                    package_name = text(source_bytes, c2)
                     break
-        elif ch.type == "import_declaration":
-            imports.append(_text(source_bytes, ch).replace("import", "").replace("static", "").replace(";", "").strip())
+        elif t == "import_declaration":
+            imports.append(text(source_bytes, ch).replace("import", "").replace("static", "").replace(";", "").strip())
 
+    # FQNs (and so their ids) recur across files, e.g. a shared base class
     def fqn(name: str) -> str:
-        return f"{package_name}.{name}" if package_name else name
+        return intern(f"{package_name}.{name}") if package_name else name
+
+    # CALLS extras differ only by qualifier and callee within a file: one
+    # shared, read-only dict per distinct pair.
+    call_extras: Dict[Tuple[Optional[str], str], Dict[str, Any]] = {}
+    # Staging buffer for one method's (target, qualifier, callee) triples,
+    # cleared and refilled per method rather than reallocated.
+    calls: List[Tuple[str, Optional[str], str]] = []
+    add_call = calls.append
+
+    # One placeholder Node per referenced super type per file
+    placeholder_ids: set = set()
 
     # Top-level type declarations
-    for td in [c for c in root.children if c.type in ("class_declaration", "interface_declaration", "enum_declaration")]:
-        tname = None
-        for c2 in td.children:
-            if c2.type == "identifier":
-                tname = _text(source_bytes, c2)
-                break
+    for td in type_decls:
+        name_node = td.child_by_field_name("name")
+        tname = text_ident(source_bytes, name_node) if name_node is not None else None
         if not tname:
             continue
 
         kind = td.type
-        if   kind == "class_declaration":     ntype = NodeType.CLASS
-        elif kind == "interface_declaration": ntype = NodeType.INTERFACE
+        if   kind == "class_declaration":     ntype = CLASS
+        elif kind == "interface_declaration": ntype = INTERFACE
         else:                                   ntype = NodeType.ENUM
 
         class_fqn = fqn(tname)
-        class_id = f"java::{class_fqn}"
+        class_id = jid(class_fqn)
 
         # Class annotations
-        class_annos_nodes = []
-        for c2 in td.children:
-            if c2.type == "modifiers":
-                for m in c2.children:
-                    if m.type in ("annotation", "marker_annotation"):
-                        class_annos_nodes.append(m)
-        class_annos = [_annotation_to_record(source_bytes, a) for a in class_annos_nodes]
+        class_modifiers, class_annos_nodes = _split_modifiers(source_bytes, td)
+        class_annos, class_anno_names, class_anno_texts, class_anno_args = _annotation_lists(source_bytes, class_annos_nodes)
         class_http_raw = _extract_http_basic(class_annos)
+        class_has_http = any(class_http_raw.values())
 
         class_node = Node(
             id=class_id,
@@ -425,165 +667,200 @@ def parse_java_source_ts(src: str, path: str) -> Tuple[List[Node], List[Edge]]:
             fqn=class_fqn,
             file=path,
             line=(td.start_point[0] + 1),
-            modifiers=[],
-            annotations=[d["name"] for d in class_annos],
+            modifiers=class_modifiers,
+            annotations=class_anno_names,
             extras={
                 "fields": {},
-                "annotation_texts": [d["full"] for d in class_annos],
-                "annotation_args":  [d["args"] for d in class_annos],
-                "http": class_http_raw if any(class_http_raw.values()) else None,
+                "annotation_texts": class_anno_texts,
+                "annotation_args":  class_anno_args,
+                "http": class_http_raw if class_has_http else None,
             },
         )
-        nodes.append(class_node)
-        edges.append(Edge(src=file_id, dst=class_id, type=EdgeType.CONTAINS))
+        add_node(class_node)
+        add_edge(Edge(src=file_id, dst=class_id, type=CONTAINS))
 
-        # Extends / Implements
+        # Extends / Implements (interfaces extending interfaces count as EXTENDS)
         for c2 in td.children:
-            if c2.type == "superclass":
-                for si in c2.children:
-                    if si.type in ("type_identifier", "scoped_type_identifier", "qualified_name", "identifier"):
-                        super_name = _text(source_bytes, si)
-                        super_fqn = super_name if "." in super_name else fqn(super_name)
-                        super_id = f"java::{super_fqn}"
-                        nodes.append(Node(id=super_id, type=NodeType.CLASS, name=super_fqn.split(".")[-1], fqn=super_fqn))
-                        edges.append(Edge(src=class_id, dst=super_id, type=EdgeType.EXTENDS))
-            if c2.type == "super_interfaces":
-                for si in c2.children:
-                    if si.type in ("type_identifier", "scoped_type_identifier", "qualified_name", "identifier"):
-                        iface_name = _text(source_bytes, si)
-                        iface_fqn = iface_name if "." in iface_name else fqn(iface_name)
-                        iface_id = f"java::{iface_fqn}"
-                        nodes.append(Node(id=iface_id, type=NodeType.INTERFACE, name=iface_fqn.split(".")[-1], fqn=iface_fqn))
-                        edges.append(Edge(src=class_id, dst=iface_id, type=EdgeType.IMPLEMENTS))
+            if c2.type in _EXTENDS_KINDS:
+                for super_name in _super_type_names(source_bytes, c2):
+                    super_fqn = super_name if "." in super_name else fqn(super_name)
+                    super_id = jid(super_fqn)
+                    if super_id not in placeholder_ids:
+                        placeholder_ids.add(super_id)
+                        add_node(Node(id=super_id, type=CLASS, name=intern(super_fqn.rpartition(".")[2]), fqn=super_fqn))
+                    add_edge(Edge(src=class_id, dst=super_id, type=EXTENDS))
+            elif c2.type == "super_interfaces":
+                for iface_name in _super_type_names(source_bytes, c2):
+                    iface_fqn = iface_name if "." in iface_name else fqn(iface_name)
+                    iface_id = jid(iface_fqn)
+                    if iface_id not in placeholder_ids:
+                        placeholder_ids.add(iface_id)
+                        add_node(Node(id=iface_id, type=INTERFACE, name=intern(iface_fqn.rpartition(".")[2]), fqn=iface_fqn))
+                    add_edge(Edge(src=class_id, dst=iface_id, type=IMPLEMENTS))
 
         # Class/Interface/Enum body
-        body = None
-        for c2 in td.children:
-            if c2.type in ("class_body", "interface_body", "enum_body"):
-                body = c2
-                break
+        body = td.child_by_field_name("body")
         if body is None:
             continue
 
-        # Fields (lightweight)
-        for member in body.children:
-            if member.type == "field_declaration":
-                ftype = None
-                fname = None
-                for ch in member.children:
-                    if ch.type in ("type_identifier", "integral_type", "floating_point_type", "boolean_type",
-                                   "scoped_type_identifier", "generic_type", "array_type", "qualified_name"):
-                        ftype = _text(source_bytes, ch)
-                    if ch.type == "variable_declarator":
-                        for leaf in ch.children:
-                            if leaf.type == "identifier":
-                                fname = _text(source_bytes, leaf)
-                                class_node.extras.setdefault("fields", {})[fname] = ftype
-
-            # Methods
-            if member.type == "method_declaration":
-                method_name = None
-                return_type = None
-                for ch in member.children:
-                    if ch.type == "identifier":
-                        method_name = _text(source_bytes, ch)
-                    elif ch.type in ("type_identifier", "integral_type", "floating_point_type", "boolean_type",
-                                     "scoped_type_identifier", "generic_type", "array_type", "void_type", "qualified_name"):
-                        if return_type is None:
-                            return_type = _text(source_bytes, ch)
+        # Class-level HTTP defaults are the same for every method of the class
+        base_paths     = class_http_raw.get("paths")
+        class_methods  = class_http_raw.get("methods")
+        class_consumes = class_http_raw.get("consumes")
+        class_produces = class_http_raw.get("produces")
+        class_params   = tuple(class_http_raw.get("params") or ())
+        class_headers  = tuple(class_http_raw.get("headers") or ())
+        class_name     = class_http_raw.get("name")
+        # combined paths of a method that adds no path of its own
+        class_combined = _combine_paths(base_paths, [])
+
+        if (http_only and not class_has_http
+                and source_bytes.find(b"Mapping", body.start_byte, body.end_byte) < 0):
+            members = ()
+            sites = []
+        else:
+            members = body.children
+            sites = _call_sites(body)
+        n_sites, site_i = len(sites), 0
+        # callee name -> guessed target id; the same helpers are called over and over
+        callee_ids: Dict[str, str] = {}
+
+        # One pass over the body: fields (lightweight) and methods
+        fields = class_node.extras["fields"]
+        for member in members:
+            mtype = member.type
+            if mtype == "field_declaration":
+                type_node = member.child_by_field_name("type")
+                ftype = text_ident(source_bytes, type_node) if type_node is not None else None
+                # int a = b, c;  -> a and c (the initializer b is not a field)
+                for decl in member.children_by_field_name("declarator"):
+                    name_node = decl.child_by_field_name("name")
+                    if name_node is not None:
+                        fields[text_ident(source_bytes, name_node)] = ftype
+
+            elif mtype == "method_declaration":
+                name_node = member.child_by_field_name("name")
+                type_node = member.child_by_field_name("type")
+                method_name = text_ident(source_bytes, name_node) if name_node is not None else None
+                return_type = text_ident(source_bytes, type_node) if type_node is not None else None
 
                 # Params
                 params: List[Dict[str, str]] = []
-                formals = None
-                for ch in member.children:
-                    if ch.type == "formal_parameters":
-                        formals = ch
-                        break
+                formals = member.child_by_field_name("parameters")
                 if formals:
-                    for p in [c for c in formals.children if c.type in ("formal_parameter", "receiver_parameter")]:
-                        pname, ptype = None, None
-                        for leaf in p.children:
-                            if leaf.type in ("variable_declarator_id", "identifier"):
-                                pname = _text(source_bytes, leaf).split("[", 1)[0]
-                            elif leaf.type in ("type_identifier", "integral_type", "floating_point_type", "boolean_type",
-                                               "scoped_type_identifier", "generic_type", "array_type", "qualified_name"):
-                                ptype = _text(source_bytes, leaf)
+                    for p in _formal_params(formals):
+                        pname, ptype = _param_name_type(source_bytes, p)
                         params.append({"name": pname, "type": ptype})
 
                 param_types = ",".join([(x.get("type") or "var") for x in params])
                 method_fqn = f"{class_node.fqn}.{method_name}({param_types})"
-                method_id = f"java::{method_fqn}"
+                method_id = jid(method_fqn)
 
                 # Method annotations (modifiers)
-                method_annos_nodes = []
-                for ch in member.children:
-                    if ch.type == "modifiers":
-                        for m in ch.children:
-                            if m.type in ("annotation", "marker_annotation"):
-                                method_annos_nodes.append(m)
-                m_annos = [_annotation_to_record(source_bytes, a) for a in method_annos_nodes]
-
-                # HTTP info
-                method_http_raw = _extract_http_basic(m_annos)
-                param_meta      = _extract_param_sources_ts(source_bytes, member)
-
-                base_paths        = (class_http_raw.get("paths")    if class_http_raw else [])
-                class_methods     = (class_http_raw.get("methods")  if class_http_raw else [])
-                class_consumes    = (class_http_raw.get("consumes") if class_http_raw else [])
-                class_produces    = (class_http_raw.get("produces") if class_http_raw else [])
-                class_params      = (class_http_raw.get("params")   if class_http_raw else [])
-                class_headers     = (class_http_raw.get("headers")  if class_http_raw else [])
-                class_name        = (class_http_raw.get("name")     if class_http_raw else None)
-
-                method_paths      = method_http_raw.get("paths", [])
-                combined_paths    = _combine_paths(base_paths, method_paths)
-                effective_methods  = method_http_raw.get("methods")  or class_methods
-                effective_consumes = method_http_raw.get("consumes") or class_consumes
-                effective_produces = method_http_raw.get("produces") or class_produces
-                effective_params   = _dedup([*class_params,  *method_http_raw.get("params", [])])
-                effective_headers  = _dedup([*class_headers, *method_http_raw.get("headers", [])])
-                effective_name     = method_http_raw.get("name") or class_name
+                method_modifiers, method_annos_nodes = _split_modifiers(source_bytes, member)
+                m_annos, m_anno_names, m_anno_texts, m_anno_args = _annotation_lists(source_bytes, method_annos_nodes)
+
+                # HTTP info; declarations with no mapping, no annotations and no
+                # sourced parameters (most of them) carry http=None, as classes do.
+                param_meta = _extract_param_sources_ts(source_bytes, member)
+                http = None
+                if (m_annos or class_has_http
+                        or any(ps["source"] != "unknown" for ps in param_meta["param_sources"])):
+                    method_http_raw = _extract_http_basic(m_annos)
+                    response_status = _extract_response_status(m_annos)
+                    cors            = _extract_cors(m_annos)
+
+                    method_paths      = method_http_raw.get("paths", [])
+                    combined_paths    = _combine_paths(base_paths, method_paths) if method_paths else list(class_combined)
+                    effective_methods  = method_http_raw.get("methods")  or class_methods
+                    effective_consumes = method_http_raw.get("consumes") or class_consumes
+                    effective_produces = method_http_raw.get("produces") or class_produces
+                    effective_params   = _merge_dedup(class_params, method_http_raw.get("params"))
+                    effective_headers  = _merge_dedup(class_headers, method_http_raw.get("headers"))
+                    effective_name     = method_http_raw.get("name") or class_name
+                    path_vars          = param_meta["path_variables"]
+
+                    http = {
+                        "methods":        effective_methods,
+                        "paths":          method_paths,
+                        "base_paths":     base_paths,
+                        "combined_paths": combined_paths,
+                        "consumes":       effective_consumes,
+                        "produces":       effective_produces,
+                        "params":         effective_params,
+                        "headers":        effective_headers,
+                        "name":           effective_name,
+                        "raw":            {"class": class_http_raw, "method": method_http_raw},
+                        "response_status": response_status,
+                        "cors":           cors,
+                        **param_meta,
+                        "path_variables_in_combined": _path_vars_in(path_vars, combined_paths)
+                        if path_vars and combined_paths else [],
+                    }
 
                 mnode = Node(
                     id=method_id,
-                    type=NodeType.METHOD,
+                    type=METHOD,
                     name=method_name,
                     fqn=method_fqn,
                     file=path,
                     line=(member.start_point[0] + 1),
-                    modifiers=[],
-                    annotations=[d["name"] for d in m_annos],
+                    modifiers=method_modifiers,
+                    annotations=m_anno_names,
                     params=params,
                     returns=return_type,
                     extras={
-                        "annotation_texts": [d["full"] for d in m_annos],
-                        "annotation_args":  [d["args"] for d in m_annos],
-                        "http": {
-                            "methods":        effective_methods,
-                            "paths":          method_paths,
-                            "base_paths":     base_paths,
-                            "combined_paths": combined_paths,
-                            "consumes":       effective_consumes,
-                            "produces":       effective_produces,
-                            "params":         effective_params,
-                            "headers":        effective_headers,
-                            "name":           effective_name,
-                            "raw":            {"class": class_http_raw, "method": method_http_raw},
-                            **param_meta,
-                            "path_variables_in_combined": [
-                                pv for pv in param_meta.get("path_variables", [])
-                                if any(f"{{{pv}}}" in (p or "") for p in combined_paths)
-                            ],
-                        },
+                        "annotation_texts": m_anno_texts,
+                        "annotation_args":  m_anno_args,
+                        "http": http,
                     },
                 )
-                nodes.append(mnode)
-                edges.append(Edge(src=class_id, dst=method_id, type=EdgeType.CONTAINS))
-
-        for anno_name in class_node.annotations or []:
-            edges.append(Edge(src=class_id, dst=f"anno::{anno_name}", type=EdgeType.ANNOTATED_BY))
-
-    for imp in imports:
-        edges.append(Edge(src=file_id, dst=f"import::{imp}", type=EdgeType.IMPORTS))
+                add_node(mnode)
+                add_edge(Edge(src=class_id, dst=method_id, type=CONTAINS))
+
+                # Naive call graph edges (best-effort); the resolver retargets them later.
+                # Call sites were matched once for the whole body; this method's
+                # are the next run of them inside its block. Abstract and
+                # interface methods have no block and nothing to scan.
+                block = member.child_by_field_name("body")
+                if block is None or site_i >= n_sites:
+                    continue
+                calls.clear()
+                while site_i < n_sites and sites[site_i].start_byte < block.start_byte:
+                    site_i += 1
+                end = block.end_byte
+                while site_i < n_sites and sites[site_i].start_byte < end:
+                    n = sites[site_i]
+                    site_i += 1
+                    callee = n.child_by_field_name("name")
+                    obj = n.child_by_field_name("object")
+                    # super.m() targets the parent type, not this class
+                    if callee is not None and (obj is None or obj.type != "super"):
+                        qual = None
+                        if obj is not None and obj.type in _QUALIFIER_KINDS:
+                            qual = text_ident(source_bytes, obj)
+                            if qual.startswith("this."):
+                                qual = qual[5:]
+                        callee_name = text_ident(source_bytes, callee)
+                        dst = callee_ids.get(callee_name)
+                        if dst is None:
+                            dst = callee_ids[callee_name] = jid(class_fqn + "." + callee_name)
+                        add_call((dst, qual, callee_name))
+                for dst, qual, callee_name in calls:
+                    key = (qual, callee_name)
+                    extras = call_extras.get(key)
+                    if extras is None:
+                        # the guessed target is a bare id; the resolver
+                        # matches methods by the callee name carried here
+                        extras = call_extras[key] = {"qualifier": qual, "callee": callee_name,
+                                                     "package": package_name, "imports": imports}
+                    add_edge(Edge(method_id, dst, CALLS, extras))
+
+        if class_node.annotations:
+            edges.extend([Edge(class_id, intern(_ID_ANNO + anno_name), ANNOTATED_BY)
+                          for anno_name in class_node.annotations])
+
+    if imports:
+        edges.extend([Edge(file_id, intern(_ID_IMPORT + imp), IMPORTS) for imp in imports])
 
     return nodes, edges
\ No newline at end of file
@@ -1,8 +1,16 @@
 
 from __future__ import annotations
-from typing import Literal
+import json
+import os
+import weakref
+from typing import Dict, Literal, Tuple
 from .exporters import compact_for_llm
 
+try:  # optional: one C call instead of the stdlib's per-object encoder
+    import orjson
+except ImportError:
+    orjson = None
+
 PROMPT_CONTROLLERS = (
     "You are a senior backend reviewer. Analyze the provided code graph focused on web controllers.\n"
     "Goal: identify endpoints, auth boundaries, cross-service calls, and risky patterns.\n"
@@ -26,20 +34,39 @@ PROMPT_LISTENERS = (
     "Only use the provided graph. If data is missing, call it out explicitly.\n"
 )
 
+def _encode_pack(data) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data).encode("utf-8")
+
 def write_llm_pack(G, out_dir: str, prompt_text: str):
-    import os, json
     os.makedirs(out_dir, exist_ok=True)
-    with open(os.path.join(out_dir, "pack.json"), "w", encoding="utf-8") as f:
-        json.dump(G.to_json(), f)
-    with open(os.path.join(out_dir, "prompt.txt"), "w", encoding="utf-8") as f:
-        f.write(prompt_text)
+    with open(os.path.join(out_dir, "pack.json"), "wb") as f:
+        f.write(_encode_pack(G.to_json()))
+    prompt = _PROMPT_BYTES.get(prompt_text) or prompt_text.encode("utf-8")
+    with open(os.path.join(out_dir, "prompt.txt"), "wb") as f:
+        f.write(prompt)
+
+_PROMPTS = {"controllers": PROMPT_CONTROLLERS, "listeners": PROMPT_LISTENERS}
+# The prompts are constants: encode them once, not per pack.
+_PROMPT_BYTES = {p: p.encode("utf-8") for p in _PROMPTS.values()}
+
+# graph -> budget -> (graph.version, compacted graph); both scenarios pack the
+# same compaction, so a caller building both pays for it once.
+_PACK_CACHE: "weakref.WeakKeyDictionary[object, Dict[int, Tuple[int, object]]]" = weakref.WeakKeyDictionary()
+
+def _compact_cached(graph, budget: int):
+    per_graph = _PACK_CACHE.setdefault(graph, {})
+    version = getattr(graph, "version", None)
+    hit = per_graph.get(budget)
+    if hit is not None and version is not None and hit[0] == version:
+        return hit[1]
+    pack = compact_for_llm(graph, token_budget_nodes=budget)
+    per_graph[budget] = (version, pack)
+    return pack
 
 def build_llm_pack(graph, scenario: Literal["controllers", "listeners"], out_dir: str):
-    if scenario == "controllers":
-        pack = compact_for_llm(graph, token_budget_nodes=400)
-        write_llm_pack(pack, out_dir, PROMPT_CONTROLLERS)
-    elif scenario == "listeners":
-        pack = compact_for_llm(graph, token_budget_nodes=400)
-        write_llm_pack(pack, out_dir, PROMPT_LISTENERS)
-    else:
+    prompt = _PROMPTS.get(scenario)
+    if prompt is None:
         raise ValueError("unknown scenario")
+    write_llm_pack(_compact_cached(graph, 400), out_dir, prompt)
@@ -1,6 +1,7 @@
 from __future__ import annotations
 import ast
-from typing import List, Tuple
+import sys
+from typing import Dict, List, Tuple
 from .graph_schema import Node, Edge, NodeType, EdgeType
 
 def _decostr(d: ast.AST) -> tuple[str, str, dict]:
@@ -32,82 +33,119 @@ def _decostr(d: ast.AST) -> tuple[str, str, dict]:
         nm = name_of(d)
         return f"@{nm}", f"@{nm}", {}
 
+def _decorator_lists(decorators) -> tuple[list, list, list]:
+    """(names, texts, args) of a def's decorators, in one pass."""
+    names, texts, argss = [], [], []
+    for d in decorators or ():
+        n, t, a = _decostr(d)
+        names.append(n); texts.append(t); argss.append(a)
+    return names, texts, argss
+
+# Stack markers: leaving a class body / a method subtree.
+_POP_CLASS = object()
+_POP_METHOD = object()
+
 def parse_python_source(src: str, path: str) -> Tuple[List[Node], List[Edge]]:
+    """Parse one Python file into graph nodes/edges.
+
+    A single pre-order pass over the tree (the order NodeVisitor used) emits
+    classes/functions and collects each method's call sites as it goes.
+    """
     tree = ast.parse(src)
     nodes: List[Node] = []
     edges: List[Edge] = []
-    file_id = f"file::{path}"
+    # ids/fqns recur across files (base classes, call targets); intern them
+    intern = sys.intern
+    file_id = intern(f"file::{path}")
     nodes.append(Node(id=file_id, type=NodeType.FILE, name=path.split('/')[-1], fqn=path, file=path))
 
-    class_stack = []
-    funcs_in_class = {}
+    ClassDef, FunctionDef, Call = ast.ClassDef, ast.FunctionDef, ast.Call
+    Name, Attribute = ast.Name, ast.Attribute
+    iter_children = ast.iter_child_nodes
+    add_node, add_edge = nodes.append, edges.append
+    CLASS, METHOD, FUNCTION = NodeType.CLASS, NodeType.METHOD, NodeType.FUNCTION
+    CONTAINS, EXTENDS, CALLS = EdgeType.CONTAINS, EdgeType.EXTENDS, EdgeType.CALLS
 
-    class Visitor(ast.NodeVisitor):
-        def visit_ClassDef(self, node: ast.ClassDef):
-            anns = [_decostr(d) for d in (node.decorator_list or [])]
-            anno_names = [a for a,_,_ in anns]
-            anno_texts = [b for _,b,_ in anns]
-            anno_args = [c for _,_,c in anns]
+    class_stack: List[str] = []
+    # class fqn -> [(method_id, call sites)]; a site is (depth below the
+    # method, pre-order index, name, qualifier) so sorting yields ast.walk order.
+    funcs_in_class: Dict[str, List[Tuple[str, list]]] = {}
+    # (call sites, depth) of every method enclosing the current node
+    open_methods: List[Tuple[list, int]] = []
 
-            fqn = ".".join([*class_stack, node.name])
-            class_id = f"py::{fqn}"
-            cn = Node(id=class_id, type=NodeType.CLASS, name=node.name, fqn=fqn, file=path, line=node.lineno,
-                      annotations=anno_names, extras={"annotation_texts": anno_texts, "annotation_args": anno_args})
-            nodes.append(cn)
-            edges.append(Edge(src=file_id, dst=class_id, type=EdgeType.CONTAINS))
+    order = 0
+    stack: list = [(tree, 0)]
+    while stack:
+        node, depth = stack.pop()
+        if node is _POP_CLASS:
+            class_stack.pop()
+            continue
+        if node is _POP_METHOD:
+            open_methods.pop()
+            continue
+        order += 1
+        t = type(node)
+        if t is Call:
+            if open_methods:
+                func = node.func
+                name = None; qual = None
+                if isinstance(func, Name):
+                    name = func.id
+                elif isinstance(func, Attribute):
+                    name = func.attr
+                    qual = getattr(func.value, "id", None)
+                if name:
+                    for sites, mdepth in open_methods:
+                        sites.append((depth - mdepth, order, name, qual))
+        elif t is ClassDef:
+            anno_names, anno_texts, anno_args = _decorator_lists(node.decorator_list)
+            fqn = intern(".".join([*class_stack, node.name]))
+            class_id = intern(f"py::{fqn}")
+            add_node(Node(id=class_id, type=CLASS, name=node.name, fqn=fqn, file=path, line=node.lineno,
+                              annotations=anno_names,
+                              extras={"annotation_texts": anno_texts, "annotation_args": anno_args}))
+            add_edge(Edge(src=file_id, dst=class_id, type=CONTAINS))
 
             # Bases as extends (shallow)
             for b in node.bases:
                 base_name = getattr(b, 'id', None) or getattr(b, 'attr', None)
                 if base_name:
-                    base_id = f"py::{base_name}"
-                    nodes.append(Node(id=base_id, type=NodeType.CLASS, name=base_name, fqn=base_name))
-                    edges.append(Edge(src=class_id, dst=base_id, type=EdgeType.EXTENDS))
+                    base_id = intern(f"py::{base_name}")
+                    add_node(Node(id=base_id, type=CLASS, name=base_name, fqn=base_name))
+                    add_edge(Edge(src=class_id, dst=base_id, type=EXTENDS))
 
             class_stack.append(node.name)
             funcs_in_class[fqn] = []
-            self.generic_visit(node)
-            class_stack.pop()
-
-        def visit_FunctionDef(self, node: ast.FunctionDef):
-            anns = [_decostr(d) for d in (node.decorator_list or [])]
-            anno_names = [a for a,_,_ in anns]
-            anno_texts = [b for _,b,_ in anns]
-            anno_args = [c for _,_,c in anns]
-
+            stack.append((_POP_CLASS, 0))
+        elif t is FunctionDef:
+            anno_names, anno_texts, anno_args = _decorator_lists(node.decorator_list)
+            extras = {"annotation_texts": anno_texts, "annotation_args": anno_args}
             if class_stack:
-                fqn = ".".join([*class_stack, node.name])
-                method_id = f"py::{fqn}"
-                mn = Node(id=method_id, type=NodeType.METHOD, name=node.name, fqn=fqn, file=path, line=node.lineno,
-                          annotations=anno_names, extras={"annotation_texts": anno_texts, "annotation_args": anno_args})
-                nodes.append(mn)
-                class_id = f"py::{'.'.join(class_stack)}"
-                edges.append(Edge(src=class_id, dst=method_id, type=EdgeType.CONTAINS))
-                funcs_in_class['.'.join(class_stack)].append((method_id, node))
+                owner = ".".join(class_stack)
+                fqn = intern(f"{owner}.{node.name}")
+                method_id = intern(f"py::{fqn}")
+                add_node(Node(id=method_id, type=METHOD, name=node.name, fqn=fqn, file=path, line=node.lineno,
+                                  annotations=anno_names, extras=extras))
+                add_edge(Edge(src=intern(f"py::{owner}"), dst=method_id, type=CONTAINS))
+                sites: list = []
+                funcs_in_class[owner].append((method_id, sites))
+                open_methods.append((sites, depth))
+                stack.append((_POP_METHOD, 0))
             else:
                 fqn = node.name
-                fn_id = f"py::{fqn}"
-                fn = Node(id=fn_id, type=NodeType.FUNCTION, name=node.name, fqn=fqn, file=path, line=node.lineno,
-                          annotations=anno_names, extras={"annotation_texts": anno_texts, "annotation_args": anno_args})
-                nodes.append(fn)
-                edges.append(Edge(src=file_id, dst=fn_id, type=EdgeType.CONTAINS))
-            self.generic_visit(node)
-
-    v = Visitor(); v.visit(tree)
+                fn_id = intern(f"py::{fqn}")
+                add_node(Node(id=fn_id, type=FUNCTION, name=node.name, fqn=fqn, file=path, line=node.lineno,
+                                  annotations=anno_names, extras=extras))
+                add_edge(Edge(src=file_id, dst=fn_id, type=CONTAINS))
+        children = list(iter_children(node))
+        if children:
+            depth += 1
+            stack.extend((c, depth) for c in reversed(children))
 
     # Simple call edges inside methods
     for class_fqn, items in funcs_in_class.items():
-        for method_id, node in items:
-            for child in ast.walk(node):
-                if isinstance(child, ast.Call):
-                    name = None; qual = None
-                    if isinstance(child.func, ast.Name):
-                        name = child.func.id
-                    elif isinstance(child.func, ast.Attribute):
-                        name = child.func.attr
-                        qual = getattr(child.func.value, "id", None)
-                    if name:
-                        guess = f"{class_fqn}.{name}"
-                        callee_id = f"py::{guess}"
-                        edges.append(Edge(src=method_id, dst=callee_id, type=EdgeType.CALLS, extras={"qualifier": qual}))
-    return nodes, edges
\ No newline at end of file
+        for method_id, sites in items:
+            sites.sort()
+            edges.extend([Edge(src=method_id, dst=intern(f"py::{class_fqn}.{name}"), type=CALLS, extras={"qualifier": qual})
+                          for _, _, name, qual in sites])
+    return nodes, edges
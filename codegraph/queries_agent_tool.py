@@ -5,21 +5,39 @@ import json
 import re
 from dataclasses import asdict, is_dataclass
 
+try:  # optional C decoder for the (large) node/edge arrays
+    import orjson
+except ImportError:
+    orjson = None
+
 # Import your query engine
-from codegraph.queries import GraphIndex, build_index
+from codegraph.queries_ts import GraphIndex, build_index
+from codegraph.queries_ts import any_path_matches, cached_rx
 
 # ---- Simple in-memory registry so the agent can "load" a graph once and query it later
 _REGISTRY: Dict[str, GraphIndex] = {}
 
 def _coerce(obj):
     """Make Node/Edge (dataclasses) JSON-safe."""
-    if is_dataclass(obj):
-        return asdict(obj)
-    if isinstance(obj, (list, tuple)):
-        return [_coerce(x) for x in obj]
-    if isinstance(obj, dict):
-        return {k: _coerce(v) for k, v in obj.items()}
-    return obj
+    # Worklist of (container, key) slots still to convert; containers are
+    # copied before their slots are rewritten, so the input is not mutated.
+    root = [obj]
+    todo: List[Tuple[Any, Any]] = [(root, 0)]
+    while todo:
+        holder, key = todo.pop()
+        o = holder[key]
+        to_dict = getattr(o, "to_dict", None)
+        if to_dict is not None:
+            holder[key] = to_dict()
+        elif is_dataclass(o):
+            holder[key] = asdict(o)
+        elif isinstance(o, (list, tuple)):
+            new = holder[key] = list(o)
+            todo.extend((new, i) for i in range(len(new)))
+        elif isinstance(o, dict):
+            new = holder[key] = dict(o)
+            todo.extend((new, k) for k in new)
+    return root[0]
 
 # ---------- Tool functions (agent-callable) ----------
 
@@ -32,8 +50,9 @@ def load_graph(graph_id: str, nodes_json: str, edges_json: str) -> Dict[str, Any
 
     Returns: { "ok": true, "graph_id": ..., "node_count": N, "edge_count": M }
     """
-    nodes = json.loads(nodes_json)
-    edges = json.loads(edges_json)
+    loads = orjson.loads if orjson is not None else json.loads
+    nodes = loads(nodes_json)
+    edges = loads(edges_json)
     idx = build_index(nodes, edges)  # GraphIndex can accept dict-like nodes/edges
     _REGISTRY[graph_id] = idx
     return {"ok": True, "graph_id": graph_id, "node_count": len(nodes), "edge_count": len(edges)}
@@ -59,19 +78,16 @@ def endpoints_by_method(graph_id: str, http_methods: List[str]) -> Dict[str, Any
     Filter endpoints by HTTP verb(s), e.g. ["GET","POST"].
     """
     idx = _REGISTRY[graph_id]
-    verbs = {v.upper() for v in (http_methods or [])}
     out = []
-    for m in idx.endpoints():
+    for m in idx.endpoints_by_method(*(http_methods or [])):
         hb = (m.extras or {}).get("http") or {}
-        methods = hb.get("methods") or []
-        if any(v in verbs for v in (x.upper() for x in methods)):
-            parent = idx.parent_class_of(m.id)
-            out.append({
-                "controller": parent.fqn if parent else None,
-                "method_fqn": m.fqn,
-                "http_methods": methods,
-                "combined_paths": hb.get("combined_paths") or hb.get("paths") or hb.get("base_paths") or [],
-            })
+        parent = idx.parent_class_of(m.id)
+        out.append({
+            "controller": parent.fqn if parent else None,
+            "method_fqn": m.fqn,
+            "http_methods": hb.get("methods") or [],
+            "combined_paths": hb.get("combined_paths") or hb.get("paths") or hb.get("base_paths") or [],
+        })
     return {"endpoints": out}
 
 def endpoints_by_path_regex(graph_id: str, pattern: str, use_combined: bool = True) -> Dict[str, Any]:
@@ -80,12 +96,12 @@ def endpoints_by_path_regex(graph_id: str, pattern: str, use_combined: bool = Tr
     use_combined = True to match class+method paths; False to match method-local paths only.
     """
     idx = _REGISTRY[graph_id]
-    rx = re.compile(pattern)
+    search = cached_rx(pattern).search
     out = []
     for m in idx.endpoints():
         hb = (m.extras or {}).get("http") or {}
         paths = (hb.get("combined_paths") if use_combined else hb.get("paths")) or []
-        if any(rx.search(p or "") for p in paths):
+        if any_path_matches(search, paths):
             parent = idx.parent_class_of(m.id)
             out.append({
                 "controller": parent.fqn if parent else None,
@@ -124,8 +140,7 @@ def calls_from(graph_id: str, method_fqn: str, depth: int = 1) -> Dict[str, Any]
     Uses CALLS edges (best-effort).
     """
     idx = _REGISTRY[graph_id]
-    # find node
-    target = next((n for n in idx.method_nodes() if n.fqn == method_fqn), None)
+    target = idx.by_fqn.get(method_fqn)
     if not target:
         return {"called": [], "warning": f"method not found: {method_fqn}"}
     called = list(idx.calls_from(target, depth=depth))
@@ -136,29 +151,29 @@ def endpoint_detail(graph_id: str, method_fqn: str) -> Dict[str, Any]:
     Return a single endpoint row from the test matrix for method_fqn (if any).
     """
     idx = _REGISTRY[graph_id]
-    for m in idx.endpoints():
-        if m.fqn == method_fqn:
-            hb = (m.extras or {}).get("http") or {}
-            parent = idx.parent_class_of(m.id)
-            return {
-                "controller": parent.fqn if parent else None,
-                "method_fqn": m.fqn,
-                "http_methods": hb.get("methods", []),
-                "paths": hb.get("paths", []),
-                "base_paths": hb.get("base_paths", []),
-                "combined_paths": hb.get("combined_paths", []) or (hb.get("paths", []) or hb.get("base_paths", [])),
-                "consumes": hb.get("consumes", []),
-                "produces": hb.get("produces", []),
-                "path_variables": hb.get("path_variables", []),
-                "query_params": hb.get("query_params", []),
-                "header_params": hb.get("header_params", []),
-                "body_params": hb.get("body_params", []),
-                "cookie_params": hb.get("cookie_params", []),
-                "param_sources": hb.get("param_sources", []),
-                "response_status": hb.get("response_status"),
-                "cors": hb.get("cors"),
-            }
-    return {"warning": f"endpoint not found: {method_fqn}"}
+    m = idx.endpoint_by_fqn.get(method_fqn)
+    if m is None:
+        return {"warning": f"endpoint not found: {method_fqn}"}
+    hb = idx._http_block(m) or {}
+    parent = idx.parent_class_of(m.id)
+    return {
+        "controller": parent.fqn if parent else None,
+        "method_fqn": m.fqn,
+        "http_methods": hb.get("methods", []),
+        "paths": hb.get("paths", []),
+        "base_paths": hb.get("base_paths", []),
+        "combined_paths": hb.get("combined_paths", []) or (hb.get("paths", []) or hb.get("base_paths", [])),
+        "consumes": hb.get("consumes", []),
+        "produces": hb.get("produces", []),
+        "path_variables": hb.get("path_variables", []),
+        "query_params": hb.get("query_params", []),
+        "header_params": hb.get("header_params", []),
+        "body_params": hb.get("body_params", []),
+        "cookie_params": hb.get("cookie_params", []),
+        "param_sources": hb.get("param_sources", []),
+        "response_status": hb.get("response_status"),
+        "cors": hb.get("cors"),
+    }
 
 def to_llm_payload(graph_id: str, limit: Optional[int] = None) -> Dict[str, Any]:
     """
@@ -1,15 +1,38 @@
 # codegraph/queries.py
 from __future__ import annotations
-from typing import Iterable, List, Dict, Any, Tuple, Optional, Set, Callable
+from typing import Iterable, List, Dict, Any, Tuple, Optional, Set, FrozenSet, Callable
 import re
 import json
 from collections import defaultdict
+from functools import lru_cache
+
+try:  # optional C encoder for generate_llm_json
+    import orjson
+except ImportError:
+    orjson = None
 
 # Minimal type duck-typing: we only rely on .id, .type.name, .fqn, .name, .extras, etc.
 NodeLike = Any
 EdgeLike = Any
 
 HTTP = "http"
+_CONTROLLER_TAGS = frozenset({"@Controller", "@RestController"})
+
+@lru_cache(maxsize=256)
+def cached_rx(pattern: str) -> "re.Pattern[str]":
+    """Compiled pattern; agents tend to repeat the same path filters."""
+    return re.compile(pattern)
+
+def any_path_matches(search: Callable[[str], Any], paths: List[str]) -> bool:
+    """search() over each path, stopping at the first hit.
+
+    Paths are tested one by one rather than joined into one haystack: a
+    joined string would change what ^, $ and [^x] match.
+    """
+    for p in paths:
+        if search(p or ""):
+            return True
+    return False
 
 # ---------------------------
 # Core indexing
@@ -30,22 +53,85 @@ class GraphIndex:
         self.rev_contains: Dict[str, str] = {}                         # dst -> src
         self.calls: Dict[str, List[str]] = defaultdict(list)           # CALLS: src method -> [dst method guesses]
         self.ann_idx: Dict[str, List[NodeLike]] = defaultdict(list)    # annotation name -> nodes
-
-        # Build indices
+        self._calls_cache: Dict[Tuple[str, int], FrozenSet[str]] = {}  # (method id, depth) -> calls_from result
+
+        # Column views parallel to self.nodes, for scans that only need
+        # one or two fields
+        self.node_ids: List[str] = []
+        self.node_types: List[str] = []
+        self.node_fqns: List[Optional[str]] = []
+
+        # Build indices (containers and appends bound once). Types are enums
+        # in this codebase and Enum.name is a descriptor call, so each type
+        # value's name is worked out once.
+        type_names: Dict[Any, str] = {}
+        def type_name(t: Any) -> str:
+            name = type_names[t] = getattr(t, "name", None) or str(t)
+            return name
+
+        by_id, by_type, ann_idx = self.by_id, self.by_type, self.ann_idx
+        add_id, add_type, add_fqn = self.node_ids.append, self.node_types.append, self.node_fqns.append
         for n in self.nodes:
-            self.by_id[n.id] = n
-            tname = getattr(getattr(n, "type", None), "name", None) or str(getattr(n, "type", None))
-            self.by_type[tname].append(n)
-            for ann in (getattr(n, "annotations", None) or []):
-                self.ann_idx[ann].append(n)
-
+            by_id[n.id] = n
+            t = getattr(n, "type", None)
+            tname = type_names.get(t) or type_name(t)
+            by_type[tname].append(n)
+            add_id(n.id)
+            add_type(tname)
+            add_fqn(getattr(n, "fqn", None))
+            for ann in (getattr(n, "annotations", None) or ()):
+                ann_idx[ann].append(n)
+
+        contains, rev_contains, calls = self.contains, self.rev_contains, self.calls
         for e in self.edges:
-            etype = getattr(getattr(e, "type", None), "name", None) or str(getattr(e, "type", None))
+            t = getattr(e, "type", None)
+            etype = type_names.get(t) or type_name(t)
             if etype == "CONTAINS":
-                self.contains[e.src].append(e.dst)
-                self.rev_contains[e.dst] = e.src
+                contains[e.src].append(e.dst)
+                rev_contains[e.dst] = e.src
             elif etype == "CALLS":
-                self.calls[e.src].append(e.dst)
+                calls[e.src].append(e.dst)
+
+        # First method per fqn (overloads share one), for lookups by name.
+        self.by_fqn: Dict[str, NodeLike] = {}
+        for i, (t, f) in enumerate(zip(self.node_types, self.node_fqns)):
+            if t == "METHOD" and f:
+                self.by_fqn.setdefault(f, self.nodes[i])
+
+        # Controller classes, from the annotation index rather than a per-class
+        # annotation set; identity keeps same-id placeholder nodes out.
+        tagged = {id(n) for tag in _CONTROLLER_TAGS for n in self.ann_idx.get(tag, ())}
+        self._controllers: List[NodeLike] = [n for n in self.class_nodes() if id(n) in tagged]
+
+        # Endpoints are fixed once the index is built: find them once, and
+        # bucket them by owning class for controller-restricted queries.
+        self._endpoints: List[NodeLike] = []
+        self.endpoint_by_fqn: Dict[str, NodeLike] = {}                # first endpoint per fqn
+        self._endpoints_by_controller: Dict[str, List[NodeLike]] = defaultdict(list)
+        # (endpoint, owning class) pairs in endpoint order, and each
+        # controller's positions in it; test_matrix rows
+        self._owned_endpoints: List[Tuple[NodeLike, NodeLike]] = []
+        self._owned_by_controller: Dict[str, List[int]] = defaultdict(list)
+        self._test_matrix_cache: Optional[List[Dict[str, Any]]] = None  # one row per _owned_endpoints entry
+        # method id -> extras["http"], pulled out once for the endpoint filters
+        self._http: Dict[str, Dict[str, Any]] = {}
+        self._verbs_up: Dict[str, FrozenSet[str]] = {}                 # method id -> upper-cased http methods
+        for m in self.method_nodes():
+            hb = self._raw_http_block(m)
+            if not hb:
+                continue
+            if m.id not in self._http:
+                self._http[m.id] = hb
+                self._verbs_up[m.id] = frozenset(str(x).upper() for x in (hb.get("methods") or []))
+            if not (hb.get("methods") or hb.get("base_paths") or hb.get("paths") or hb.get("combined_paths")):
+                continue
+            self._endpoints.append(m)
+            self.endpoint_by_fqn.setdefault(m.fqn, m)
+            parent = self.parent_class_of(m.id)
+            if parent:
+                self._endpoints_by_controller[parent.fqn].append(m)
+                self._owned_by_controller[parent.fqn].append(len(self._owned_endpoints))
+                self._owned_endpoints.append((m, parent))
 
     # ----------------------------------
     # Node helpers
@@ -86,13 +172,17 @@ class GraphIndex:
     # ----------------------------------
 
     def is_controller(self, node: NodeLike) -> bool:
-        anns = set(getattr(node, "annotations", []) or [])
-        return any(a in anns for a in ("@Controller", "@RestController"))
+        return not _CONTROLLER_TAGS.isdisjoint(getattr(node, "annotations", []) or ())
 
     def controllers(self) -> List[NodeLike]:
-        return [n for n in self.class_nodes() if self.is_controller(n)]
+        return list(self._controllers)
 
     def _http_block(self, node: NodeLike) -> Optional[Dict[str, Any]]:
+        hb = self._http.get(node.id)
+        return hb if hb is not None else self._raw_http_block(node)
+
+    @staticmethod
+    def _raw_http_block(node: NodeLike) -> Optional[Dict[str, Any]]:
         return ((getattr(node, "extras", {}) or {}).get(HTTP) if getattr(node, "extras", None) else None)
 
     def endpoints(self, controller_fqn: Optional[str] = None) -> List[NodeLike]:
@@ -100,47 +190,30 @@ class GraphIndex:
         All METHOD nodes that have HTTP mapping (either method-level or inherited via class base).
         If controller_fqn is provided, restrict to that controller class.
         """
-        out = []
-        for m in self.method_nodes():
-            hb = self._http_block(m)
-            if not hb:
-                continue
-            methods = hb.get("methods") or []
-            base = hb.get("base_paths") or []
-            paths = hb.get("paths") or []
-            combined = hb.get("combined_paths") or []
-            if not (methods or base or paths or combined):
-                continue
-            if controller_fqn:
-                parent = self.parent_class_of(m.id)
-                if not parent or parent.fqn != controller_fqn:
-                    continue
-            out.append(m)
-        return out
+        if controller_fqn:
+            return list(self._endpoints_by_controller.get(controller_fqn, ()))
+        return list(self._endpoints)
 
     def endpoints_by_method(self, *verbs: str) -> List[NodeLike]:
         verbs_up = {v.upper() for v in verbs}
-        out = []
-        for m in self.endpoints():
-            methods = (self._http_block(m) or {}).get("methods") or []
-            if any(v.upper() in verbs_up for v in methods):
-                out.append(m)
-        return out
+        empty: FrozenSet[str] = frozenset()
+        vu = self._verbs_up
+        return [m for m in self._endpoints if not verbs_up.isdisjoint(vu.get(m.id, empty))]
 
     def endpoints_by_path_regex(self, pattern: str, use_combined: bool = True) -> List[NodeLike]:
-        rx = re.compile(pattern)
+        search = cached_rx(pattern).search
         out = []
-        for m in self.endpoints():
-            hb = self._http_block(m) or {}
+        for m in self._endpoints:
+            hb = self._http.get(m.id) or {}
             paths = (hb.get("combined_paths") if use_combined else hb.get("paths")) or []
-            if any(rx.search(p or "") for p in paths):
+            if any_path_matches(search, paths):
                 out.append(m)
         return out
 
     def endpoints_with_missing_paths(self) -> List[NodeLike]:
         out = []
-        for m in self.endpoints():
-            hb = self._http_block(m) or {}
+        for m in self._endpoints:
+            hb = self._http.get(m.id) or {}
             if not (hb.get("paths") or hb.get("combined_paths") or hb.get("base_paths")):
                 out.append(m)
         return out
@@ -150,8 +223,8 @@ class GraphIndex:
         source ∈ {'path','query','header','body','cookie','part'}
         """
         out = []
-        for m in self.endpoints():
-            hb = self._http_block(m) or {}
+        for m in self._endpoints:
+            hb = self._http.get(m.id) or {}
             key = f"{source}_params" if source != "body" else "body_params"
             vals = hb.get(key) or []
             if vals:
@@ -160,16 +233,16 @@ class GraphIndex:
 
     def endpoints_by_query_param(self, name: str) -> List[NodeLike]:
         out = []
-        for m in self.endpoints():
-            hb = self._http_block(m) or {}
+        for m in self._endpoints:
+            hb = self._http.get(m.id) or {}
             if name in (hb.get("query_params") or []):
                 out.append(m)
         return out
 
     def endpoints_by_path_variable(self, name: str) -> List[NodeLike]:
         out = []
-        for m in self.endpoints():
-            hb = self._http_block(m) or {}
+        for m in self._endpoints:
+            hb = self._http.get(m.id) or {}
             if name in (hb.get("path_variables") or []):
                 out.append(m)
         return out
@@ -180,8 +253,8 @@ class GraphIndex:
         """
         out = []
         status_suffix = status_suffix.upper()
-        for m in self.endpoints():
-            hb = self._http_block(m) or {}
+        for m in self._endpoints:
+            hb = self._http.get(m.id) or {}
             st = (hb.get("response_status") or "")
             if st and (st.upper().endswith(status_suffix) or st.upper() == status_suffix):
                 out.append(m)
@@ -189,8 +262,8 @@ class GraphIndex:
 
     def endpoints_with_cors(self) -> List[NodeLike]:
         out = []
-        for m in self.endpoints():
-            hb = self._http_block(m) or {}
+        for m in self._endpoints:
+            hb = self._http.get(m.id) or {}
             if hb.get("cors"):
                 out.append(m)
         return out
@@ -204,19 +277,32 @@ class GraphIndex:
         Return a set of method IDs that are directly (or transitively up to depth) called by method_node.
         Uses the best-effort CALLS edges from the parsers.
         """
-        seen: Set[str] = set()
-        frontier: Set[str] = {method_node.id}
-        for _ in range(max(0, depth)):
-            new_frontier: Set[str] = set()
-            for mid in frontier:
-                for dst in self.calls.get(mid, []):
-                    if dst not in seen:
-                        seen.add(dst)
-                        new_frontier.add(dst)
-            frontier = new_frontier
-            if not frontier:
-                break
-        return seen
+        key = (method_node.id, depth)
+        hit = self._calls_cache.get(key)
+        if hit is not None:
+            return set(hit)
+        # Explicit-stack DFS. A node keeps the most hops it had left when
+        # reached and is expanded again only if a shorter route leaves more,
+        # so the result equals the level-by-level BFS.
+        left: Dict[str, int] = {}
+        calls = self.calls
+        stack = [(method_node.id, depth)]
+        while stack:
+            mid, d = stack.pop()
+            if d <= 0:
+                continue
+            d -= 1
+            for dst in calls.get(mid, ()):
+                if left.get(dst, -1) < d:
+                    left[dst] = d
+                    stack.append((dst, d))
+        # depth - left[n] is n's hop distance, so the shallower walks from the
+        # same root fall out of this one.
+        cache = self._calls_cache
+        for k in range(1, depth):
+            cache.setdefault((method_node.id, k), frozenset(n for n, d in left.items() if depth - d <= k))
+        cache[key] = frozenset(left)
+        return set(left)
 
     # ----------------------------------
     # Test matrix & LLM payloads
@@ -225,16 +311,22 @@ class GraphIndex:
     def test_matrix(self, only_controllers: Optional[List[str]] = None) -> List[Dict[str, Any]]:
         """
         Produce a structured matrix of endpoints suitable for generating integration tests.
+        Rows are built once per index and shared between calls; the list is new each time.
         """
-        out: List[Dict[str, Any]] = []
+        rows = self._test_matrix_cache
+        if rows is None:
+            rows = self._test_matrix_cache = self._build_test_matrix()
         allowed = set(only_controllers or [])
-        for m in self.endpoints():
-            parent = self.parent_class_of(m.id)
-            if not parent:
-                continue
-            if allowed and parent.fqn not in allowed:
-                continue
-            hb = self._http_block(m) or {}
+        if allowed:
+            # only the requested controllers' rows, kept in endpoint order
+            by_ctrl = self._owned_by_controller
+            return [rows[i] for i in sorted(i for c in allowed for i in by_ctrl.get(c, ()))]
+        return list(rows)
+
+    def _build_test_matrix(self) -> List[Dict[str, Any]]:
+        out: List[Dict[str, Any]] = []
+        for m, parent in self._owned_endpoints:
+            hb = self._http.get(m.id) or {}
             row = {
                 "controller": parent.fqn,
                 "method_fqn": m.fqn,
@@ -273,7 +365,7 @@ class GraphIndex:
 
     def print_endpoints(self, controller_fqn: Optional[str] = None) -> None:
         for m in self.endpoints(controller_fqn):
-            hb = self._http_block(m) or {}
+            hb = self._http.get(m.id) or {}
             parent = self.parent_class_of(m.id)
             methods = ",".join(hb.get("methods", []) or ["<NONE>"])
             paths = hb.get("combined_paths") or hb.get("paths") or hb.get("base_paths") or []
@@ -292,7 +384,7 @@ def list_controllers(idx: GraphIndex) -> List[str]:
 def list_endpoints(idx: GraphIndex, controller_fqn: Optional[str] = None) -> List[Tuple[str, List[str], List[str]]]:
     out = []
     for m in idx.endpoints(controller_fqn):
-        hb = idx._http_block(m) or {}
+        hb = idx._http.get(m.id) or {}
         out.append((m.fqn, hb.get("methods", []), hb.get("combined_paths") or hb.get("paths") or []))
     return out
 
@@ -306,4 +398,7 @@ def endpoints_with_param_source(idx: GraphIndex, source: str) -> List[str]:
     return [m.fqn for m in idx.endpoints_with_param_source(source)]
 
 def generate_llm_json(idx: GraphIndex, limit: Optional[int] = None) -> str:
-    return json.dumps(idx.to_llm_payload(limit=limit), indent=2)
+    payload = idx.to_llm_payload(limit=limit)
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_INDENT_2).decode("utf-8")
+    return json.dumps(payload, indent=2, ensure_ascii=False)  # orjson never escapes
@@ -1,6 +1,10 @@
 from __future__ import annotations
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Tuple
+from bisect import bisect_left, bisect_right
+from itertools import chain
 import re
+import weakref
+from functools import lru_cache
 from .graph_schema import CodeGraph, NodeType, EdgeType
 
 KIND_MAP = {
@@ -12,8 +16,101 @@ KIND_MAP = {
     "function": NodeType.FUNCTION,
 }
 
-def _match_text(s: Optional[str], needle: str) -> bool:
-    return bool(s and needle.lower() in s.lower())
+# One row per node with the fields dynamic_query filters on, lower-cased
+# where it compares case-insensitively:
+# (id, type, name, fqn, file, text haystack, http)
+# where http is (paths, upper-cased methods, produces, consumes, has path variables)
+_Http = Tuple[Tuple[str, ...], frozenset, frozenset, frozenset, bool]
+_Row = Tuple[str, Any, str, str, str, str, _Http]
+_NO_HTTP: _Http = ((), frozenset(), frozenset(), frozenset(), False)
+_NO_EXTRAS: Dict[str, Any] = {}  # shared, read-only
+# Rows plus candidate lists of row positions, in node order: by node type,
+# and the nodes that carry an http block; then every row's haystack joined
+# by NUL with each row's start offset in it, for whole-graph text search;
+# then lower-cased annotation name -> rows, and all lower-cased annotation
+# texts sorted (with their rows alongside) for prefix lookups
+_Rows = Tuple[List[_Row], Dict[Any, List[int]], List[int], str, List[int],
+              Dict[str, List[int]], List[str], List[int]]
+# graph -> (graph.node_version, rows): lower-cased once per node, rebuilt
+# only after node writes
+_ROWS_CACHE: "weakref.WeakKeyDictionary[CodeGraph, Tuple[int, _Rows]]" = weakref.WeakKeyDictionary()
+
+@lru_cache(maxsize=512)
+def _rx(pattern: str) -> "re.Pattern[str]":
+    """Compiled pattern, reused across dynamic_query calls."""
+    return re.compile(pattern)
+
+def _query_rows(G: CodeGraph) -> _Rows:
+    hit = _ROWS_CACHE.get(G)
+    if hit is not None and hit[0] == G.node_version:
+        return hit[1]
+    rows: List[_Row] = []
+    by_type: Dict[Any, List[int]] = {}
+    with_http: List[int] = []
+    starts: List[int] = []
+    offset = 0
+    anno_rows: Dict[str, List[int]] = {}
+    texts_by_row: List[Tuple[str, int]] = []
+    for n, d in G._nodes.items():
+        name, fqn, file = d.get("name"), d.get("fqn"), d.get("file")
+        annotations = d.get("annotations") or []
+        extras = d.get("extras") or _NO_EXTRAS
+        texts = extras.get("annotation_texts") or []
+        hb = extras.get("http")
+        http = _NO_HTTP if not hb else (
+            tuple(chain(hb.get("combined_paths") or (), hb.get("paths") or ())),
+            frozenset(m.upper() for m in (hb.get("methods") or [])),
+            frozenset(hb.get("produces") or []),
+            frozenset(hb.get("consumes") or []),
+            bool(hb.get("path_variables_in_combined")),
+        )
+        # what a `text` needle is searched in: name, fqn, each annotation, file,
+        # joined by NUL so one substring search covers them all
+        hay = "\0".join(s.lower() for s in (name, fqn, *annotations, file) if s and isinstance(s, str))
+        by_type.setdefault(d.get("type"), []).append(len(rows))
+        if hb:
+            with_http.append(len(rows))
+        starts.append(offset)
+        offset += len(hay) + 1
+        for a in {str(x).lower() for x in annotations}:
+            anno_rows.setdefault(a, []).append(len(rows))
+        texts_by_row.extend((str(t).lower(), len(rows)) for t in texts)
+        rows.append((n, d.get("type"), name or "", fqn or "", file or "", hay, http))
+    texts_by_row.sort()
+    built = (rows, by_type, with_http, "\0".join(r[5] for r in rows), starts,
+             anno_rows, [t for t, _ in texts_by_row], [i for _, i in texts_by_row])
+    _ROWS_CACHE[G] = (G.node_version, built)
+    return built
+
+def _text_hits(all_hay: str, starts: List[int], needle: str) -> List[int]:
+    """Positions of rows whose haystack contains needle (which holds no NUL).
+
+    One str.find pass over the joined haystacks, jumping to the next row
+    after each hit, instead of a substring test per row.
+    """
+    hits: List[int] = []
+    find, last = all_hay.find, len(starts) - 1
+    pos = all_hay.find(needle)
+    while pos >= 0:
+        row = bisect_right(starts, pos) - 1
+        hits.append(row)
+        if row == last:
+            break
+        pos = find(needle, starts[row + 1])
+    return hits
+
+def _annotation_hits(anno_rows: Dict[str, List[int]], text_keys: List[str], text_rows: List[int],
+                     want: Tuple[str, ...]) -> set:
+    """Rows with an annotation named in want, or an annotation text starting with one."""
+    hits = set()
+    for w in want:
+        hits.update(anno_rows.get(w, ()))
+        # texts with prefix w are one contiguous run of the sorted list
+        i = bisect_left(text_keys, w)
+        while i < len(text_keys) and text_keys[i].startswith(w):
+            hits.add(text_rows[i])
+            i += 1
+    return hits
 
 def dynamic_query(G: CodeGraph, q: Dict[str, Any]):
     text = q.get("text")
@@ -28,60 +125,73 @@ def dynamic_query(G: CodeGraph, q: Dict[str, Any]):
 
     # HTTP filters
     http_path_regex = q.get("http_path_regex")
-    http_method_any = [m.upper() for m in (q.get("http_method_any") or [])]
-    http_produces_any = q.get("http_produces_any") or []
-    http_consumes_any = q.get("http_consumes_any") or []
+    http_method_any = frozenset(m.upper() for m in (q.get("http_method_any") or []))
+    http_produces_any = frozenset(q.get("http_produces_any") or [])
+    http_consumes_any = frozenset(q.get("http_consumes_any") or [])
     http_has_path_vars = q.get("http_has_path_vars")
 
-    name_rx = re.compile(name_regex) if name_regex else None
-    file_rx = re.compile(file_regex) if file_regex else None
-    path_rx = re.compile(http_path_regex) if http_path_regex else None
+    name_rx = _rx(name_regex) if name_regex else None
+    file_rx = _rx(file_regex) if file_regex else None
+    path_rx = _rx(http_path_regex) if http_path_regex else None
 
-    def anno_match(d):
-        if not annos: return True
-        names = [str(x) for x in (d.get("annotations") or [])]
-        texts = [str(x) for x in ((d.get("extras", {}) or {}).get("annotation_texts") or [])]
-        nlc = {n.lower() for n in names}
-        tlc = [t.lower() for t in texts]
-        want = {a if a.startswith("@") else f"@{a}" for a in annos}
-        return any((w.lower() in nlc) or any(t.startswith(w.lower()) for t in tlc) for w in want)
+    # Everything derived from the query alone is computed once, not per node.
+    want_kind = KIND_MAP.get(kind.lower()) if kind else None
+    needle = text.lower() if text else None
+    # a needle holding NUL could straddle two fields of the joined haystack
+    split_hay = needle is not None and "\0" in needle
+    want = tuple({(a if a.startswith("@") else f"@{a}").lower() for a in annos})
+
+    http_filters = bool(path_rx or http_method_any or http_produces_any or http_consumes_any
+                        or http_has_path_vars is not None)
+
+    # Start from the smallest known candidate list: the kind's nodes, and
+    # only nodes with an http block when a filter needs one to match
+    # (has_path_vars=False also matches nodes without one).
+    rows, by_type, with_http, all_hay, starts, anno_rows, text_keys, text_rows = _query_rows(G)
+    picks = None
+    if kind:
+        picks = by_type.get(want_kind, [])
+    if path_rx or http_method_any or http_produces_any or http_consumes_any or http_has_path_vars is True:
+        picks = with_http if picks is None else [i for i in picks if rows[i][6] is not _NO_HTTP]
+    # text is matched up front over the whole graph, so the loop below
+    # only re-checks it for a NUL-holding needle
+    if needle is not None and not split_hay:
+        hits = _text_hits(all_hay, starts, needle)
+        if picks is None:
+            picks = hits
+        else:
+            hit_set = set(hits)
+            picks = [i for i in picks if i in hit_set]
+    # likewise annotations, from the name and sorted-text lookups
+    if want:
+        anno_hits = _annotation_hits(anno_rows, text_keys, text_rows, want)
+        picks = sorted(anno_hits) if picks is None else [i for i in picks if i in anno_hits]
+    candidates = rows if picks is None else map(rows.__getitem__, picks)
 
     seeds = []
-    for n, d in G.g.nodes(data=True):
-        if kind and d.get("type") != KIND_MAP.get(kind.lower()):
-            continue
-        if text and not (
-            _match_text(d.get("name"), text)
-            or _match_text(d.get("fqn"), text)
-            or any(_match_text(a, text) for a in d.get("annotations") or [])
-            or _match_text(d.get("file"), text)
-        ):
-            continue
-        if not anno_match(d):
+    # Filters left unset cost one local truth test per row; kind needs none,
+    # as the candidates already come from that type's bucket.
+    for n, _, name, fqn, file, hay, http in candidates:
+        if split_hay and not any(needle in s for s in hay.split("\0")):
             continue
-        if name_rx and not (name_rx.search(d.get("name") or "") or name_rx.search(d.get("fqn") or "")):
+        if name_rx and not (name_rx.search(name) or name_rx.search(fqn)):
             continue
-        if file_rx and not file_rx.search(d.get("file") or ""):
+        if file_rx and not file_rx.search(file):
             continue
 
-        if path_rx or http_method_any or http_produces_any or http_consumes_any or (http_has_path_vars is not None):
-            http = (d.get("extras", {}) or {}).get("http") or {}
-            paths = (http.get("combined_paths") or []) + (http.get("paths") or [])
-            methods = [m.upper() for m in (http.get("methods") or [])]
-            produces = http.get("produces") or []
-            consumes = http.get("consumes") or []
-            path_vars = (http.get("path_variables_in_combined") or [])
+        if http_filters:
+            paths, methods_up, produces, consumes, has_path_vars = http
             if path_rx and not any(path_rx.search(p or "") for p in paths):
                 continue
-            if http_method_any and not any(m in methods for m in http_method_any):
+            if http_method_any and http_method_any.isdisjoint(methods_up):
                 continue
-            if http_produces_any and not any(x in produces for x in http_produces_any):
+            if http_produces_any and http_produces_any.isdisjoint(produces):
                 continue
-            if http_consumes_any and not any(x in consumes for x in http_consumes_any):
+            if http_consumes_any and http_consumes_any.isdisjoint(consumes):
                 continue
-            if (http_has_path_vars is True) and not path_vars:
+            if (http_has_path_vars is True) and not has_path_vars:
                 continue
-            if (http_has_path_vars is False) and path_vars:
+            if (http_has_path_vars is False) and has_path_vars:
                 continue
 
         seeds.append(n)
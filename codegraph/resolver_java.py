@@ -1,16 +1,35 @@
 
 from __future__ import annotations
-from typing import List, Dict, Optional
+from typing import Any, List, Dict, Optional, Sequence, Tuple
 from .graph_schema import CodeGraph, EdgeType, NodeType, Edge
 
+# Shared stand-in for a missing extras/fields dict; only ever read.
+_EMPTY: Dict[str, Any] = {}
+
 def resolve_calls(G: CodeGraph):
+    CLASS, METHOD = NodeType.CLASS, NodeType.METHOD
+    CALLS, CONTAINS = EdgeType.CALLS, EdgeType.CONTAINS
+    # CodeGraph's aliases of the MultiDiGraph's own dicts; no view objects
+    nodes, inn, out = G._nodes, G._in, G._out
     class_nodes_by_simple: Dict[str, List[str]] = {}
-    for nid, data in G.g.nodes(data=True):
-        if data.get("type") == NodeType.CLASS:
+    for nid, data in nodes.items():
+        if data.get("type") == CLASS:
             simple = (data.get("name") or "").split(".")[-1]
             class_nodes_by_simple.setdefault(simple, []).append(nid)
 
-    def find_class_fqn(simple: str, pkg: Optional[str], imports: List[str]) -> Optional[str]:
+    # Calls from one file share pkg/imports, so the same lookups repeat;
+    # by_fqn and the class index are not touched while resolving.
+    fqn_memo: Dict[Tuple[str, Optional[str], Tuple[str, ...]], Optional[str]] = {}
+
+    def find_class_fqn(simple: str, pkg: Optional[str], imports: Sequence[str]) -> Optional[str]:
+        key = (simple, pkg, imports)
+        try:
+            return fqn_memo[key]
+        except KeyError:
+            found = fqn_memo[key] = _find_class_fqn(simple, pkg, imports)
+            return found
+
+    def _find_class_fqn(simple: str, pkg: Optional[str], imports: Sequence[str]) -> Optional[str]:
         for imp in imports or []:
             if imp.endswith("." + simple) or imp == simple:
                 return imp
@@ -19,41 +38,84 @@ def resolve_calls(G: CodeGraph):
             if nid:
                 return f"{pkg}.{simple}"
         for nid in class_nodes_by_simple.get(simple, []):
-            return G.g.nodes[nid].get("fqn")
+            return nodes[nid].get("fqn")
         return None
 
-    calls = []
-    for u, v, k, d in G.g.edges(keys=True, data=True):
-        if d.get("type") == EdgeType.CALLS:
-            calls.append((u, v, k, d))
+    # CONTAINS lookups, filled on first use per node: the resolver only
+    # rewrites CALLS edges, so these never go stale during the loop.
+    owner_memo: Dict[str, Optional[str]] = {}
+    methods_memo: Dict[str, Dict[str, List[str]]] = {}
+    fields_memo: Dict[str, Dict[str, str]] = {}
+
+    def owner_class(mid: str) -> Optional[str]:
+        """First CLASS with a CONTAINS edge into mid (in_edges order)."""
+        if mid in owner_memo:
+            return owner_memo[mid]
+        found = None
+        for pred, keyed in inn[mid].items():
+            if nodes[pred].get("type") == CLASS and any(ed.get("type") == CONTAINS for ed in keyed.values()):
+                found = pred
+                break
+        owner_memo[mid] = found
+        return found
+
+    def methods_by_name(cls: str) -> Dict[str, List[str]]:
+        """name -> METHOD ids the class CONTAINS, in out_edges order."""
+        by_name = methods_memo.get(cls)
+        if by_name is None:
+            by_name = methods_memo[cls] = {}
+            for mn, keyed in out[cls].items():
+                data = nodes[mn]
+                if data.get("type") != METHOD:
+                    continue
+                for ed in keyed.values():
+                    if ed.get("type") == CONTAINS:
+                        by_name.setdefault(data.get("name"), []).append(mn)
+        return by_name
 
+    def class_fields(cls: str) -> Dict[str, str]:
+        """Field name -> declared type for a class (extras["fields"])."""
+        fields = fields_memo.get(cls)
+        if fields is None:
+            fields = fields_memo[cls] = (nodes[cls].get("extras") or _EMPTY).get("fields", _EMPTY)
+        return fields
+
+    # snapshot of the CALLS edges, in G.g.edges() order; the loop below
+    # rewrites them
+    calls = [(u, v, k, d)
+             for u, nbrs in out.items()
+             for v, keyed in nbrs.items()
+             for k, d in keyed.items()
+             if d.get("type") == CALLS]
+
+    # Rewrites are applied after the loop: one batched removal and one
+    # bulk insert instead of a graph mutation per resolved call. The loop
+    # itself is a handful of memoized dict lookups per edge, so it stays
+    # in-process: pickling the indices and edge groups out to a pool would
+    # cost more than resolving them here.
+    pending_remove: List[Tuple[str, str, int]] = []
+    pending_add: List[Edge] = []
     for u, v, k, d in calls:
-        qual = (d.get("extras") or {}).get("qualifier")
-        pkg = (d.get("extras") or {}).get("package")
-        imports = (d.get("extras") or {}).get("imports") or []
-        member = G.g.nodes[v].get("name") or None
+        extras = d.get("extras") or _EMPTY
+        qual = extras.get("qualifier")
+        pkg = extras.get("package")
+        member = extras.get("callee") or nodes[v].get("name") or None
 
         resolved_class_fqn = None
         if qual:
+            imports = tuple(extras.get("imports") or ())
             # find caller class
-            caller_class = None
-            for pred, _, ed in G.g.in_edges(u, data=True):
-                if ed.get("type") == EdgeType.CONTAINS and G.g.nodes[pred].get("type") == NodeType.CLASS:
-                    caller_class = pred; break
+            caller_class = owner_class(u)
             if caller_class:
-                fields = (G.g.nodes[caller_class].get("extras") or {}).get("fields", {})
-                ftype = fields.get(qual)
+                ftype = class_fields(caller_class).get(qual)
                 if ftype:
                     resolved_class_fqn = find_class_fqn(ftype, pkg, imports)
             if not resolved_class_fqn and qual[:1].upper() == qual[:1]:
                 resolved_class_fqn = find_class_fqn(qual, pkg, imports)
         else:
-            caller_class = None
-            for pred, _, ed in G.g.in_edges(u, data=True):
-                if ed.get("type") == EdgeType.CONTAINS and G.g.nodes[pred].get("type") == NodeType.CLASS:
-                    caller_class = pred; break
+            caller_class = owner_class(u)
             if caller_class:
-                resolved_class_fqn = G.g.nodes[caller_class].get("fqn")
+                resolved_class_fqn = nodes[caller_class].get("fqn")
 
         if not (resolved_class_fqn and member):
             continue
@@ -62,15 +124,17 @@ def resolve_calls(G: CodeGraph):
         if not target_class_node:
             continue
 
-        method_targets = []
-        for _, mn, ed in G.g.out_edges(target_class_node, data=True):
-            if ed.get("type") == EdgeType.CONTAINS and G.g.nodes[mn].get("type") == NodeType.METHOD:
-                if G.g.nodes[mn].get("name") == member:
-                    method_targets.append(mn)
-
+        method_targets = methods_by_name(target_class_node).get(member)
         if not method_targets:
             continue
 
-        G.g.remove_edge(u, v, key=k)
-        for t in method_targets:
-            G.add_edge(Edge(src=u, dst=t, type=EdgeType.CALLS, extras={"resolved": True}))
+        pending_remove.append((u, v, k))
+        pending_add.extend(Edge(src=u, dst=t, type=CALLS, extras={"resolved": True}) for t in method_targets)
+
+    if pending_remove:
+        G.g.remove_edges_from(pending_remove)
+        G.add_edges_bulk(pending_add)
+        # The parser's guessed call targets (bare ids, no file) are left with
+        # no edges once every call into them has been retargeted.
+        G.remove_nodes({v for _, v, _ in pending_remove
+                        if nodes[v].get("file") is None and not inn[v] and not out[v]})
@@ -1,9 +1,12 @@
 from __future__ import annotations
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any
-import os, tempfile, shutil
+from typing import Optional, Dict, Any, Tuple
+from concurrent.futures import ProcessPoolExecutor
+import asyncio
+import os, tempfile, shutil, pickle, threading
 from subprocess import run
 
 from .graph_builder import build_graph_from_repo
@@ -12,7 +15,22 @@ from .queries import slice_controllers, slice_listeners
 from .llm_packager import build_llm_pack
 from .query_engine import dynamic_query
 
-app = FastAPI(title="CodeGraph Toolkit API", version="0.3.0")
+# Query workers for the app's lifetime. Each holds its own copy of the
+# current graph (and warms its own per-graph caches), so keep the count small.
+_QUERY_WORKERS = min(4, os.cpu_count() or 1)
+
+@asynccontextmanager
+async def _lifespan(app: FastAPI):
+    app.state.pool = ProcessPoolExecutor(max_workers=_QUERY_WORKERS)
+    try:
+        yield
+    finally:
+        app.state.pool.shutdown(wait=False, cancel_futures=True)
+        with _snap_lock:
+            for path in [*_in_flight, *_retired, *([app.state.current[1]] if app.state.current else [])]:
+                _discard(path)
+
+app = FastAPI(title="CodeGraph Toolkit API", version="0.3.0", lifespan=_lifespan)
 
 # Optional CORS for agent platforms
 app.add_middleware(
@@ -23,7 +41,80 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-GRAPH: Optional[CodeGraph] = None
+# The current graph and the path of its pickled snapshot. Builds assign a
+# fully built pair in one step and handlers read it once, so a rebuild never
+# blocks or disturbs queries in flight (they finish on the graph they
+# started with).
+app.state.current = None
+
+# ---- query workers: a request ships the snapshot path, its query in and the
+# JSON result back; each worker unpickles a graph once, on its first request
+# for that snapshot
+_WORKER_GRAPH: Optional[Tuple[str, CodeGraph]] = None
+
+def _worker_graph(path: str) -> CodeGraph:
+    global _WORKER_GRAPH
+    if _WORKER_GRAPH is None or _WORKER_GRAPH[0] != path:
+        _WORKER_GRAPH = None  # let the old graph go before loading the new one
+        with open(path, "rb") as f:
+            _WORKER_GRAPH = (path, pickle.load(f))
+    return _WORKER_GRAPH[1]
+
+def _run_query(path: str, q: Dict[str, Any]) -> Dict[str, Any]:
+    return dynamic_query(_worker_graph(path), q).to_json()
+
+def _run_slice(path: str, kind: str, neighbors: int) -> Dict[str, Any]:
+    fn = slice_controllers if kind == "controllers" else slice_listeners
+    return fn(_worker_graph(path), neighbors=neighbors).to_json()
+
+def _run_pack(path: str, scenario: str, out: str) -> None:
+    build_llm_pack(_worker_graph(path), scenario, out)
+
+# ---- snapshot files: a replaced snapshot is deleted once no request still
+# queued or running needs it. Builds run in the threadpool, requests on the
+# event loop, hence the lock.
+_snap_lock = threading.Lock()
+_in_flight: Dict[str, int] = {}   # snapshot path -> requests using it
+_retired: set = set()             # replaced snapshots still in use
+
+def _discard(path: str) -> None:
+    _retired.discard(path)
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+def _publish(G: CodeGraph) -> CodeGraph:
+    """Make G the current graph; it is pickled once, for the workers to load."""
+    fd, path = tempfile.mkstemp(prefix="codegraph-", suffix=".pkl")
+    with os.fdopen(fd, "wb") as f:
+        pickle.dump(G, f, protocol=pickle.HIGHEST_PROTOCOL)
+    with _snap_lock:
+        previous, app.state.current = app.state.current, (G, path)
+        if previous is not None:
+            if previous[1] in _in_flight:
+                _retired.add(previous[1])
+            else:
+                _discard(previous[1])
+    return G
+
+def _current() -> Optional[Tuple[CodeGraph, str]]:
+    return app.state.current
+
+async def _in_pool(fn, *args):
+    """Run fn(snapshot path, *args) in a query worker, on the current graph."""
+    with _snap_lock:  # read and pin the snapshot in one step
+        path = app.state.current[1]
+        _in_flight[path] = _in_flight.get(path, 0) + 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(app.state.pool, fn, path, *args)
+    finally:
+        with _snap_lock:
+            _in_flight[path] -= 1
+            if not _in_flight[path]:
+                del _in_flight[path]
+                if path in _retired:
+                    _discard(path)
 
 class BuildReq(BaseModel):
     repo: str = Field(..., description="Path to source repo mounted in container")
@@ -47,9 +138,8 @@ class PackReq(BaseModel):
 
 @app.post("/build")
 def build(req: BuildReq):
-    global GRAPH
-    GRAPH = build_graph_from_repo(req.repo, lang=req.lang)
-    return {"status": "ok", "nodes": GRAPH.g.number_of_nodes(), "edges": GRAPH.g.number_of_edges()}
+    G = _publish(build_graph_from_repo(req.repo, lang=req.lang))
+    return {"status": "ok", "nodes": G.g.number_of_nodes(), "edges": G.g.number_of_edges()}
 
 @app.post("/build-from-git")
 def build_from_git(req: BuildFromGitReq):
@@ -62,35 +152,29 @@ def build_from_git(req: BuildFromGitReq):
         r = run(cmd, capture_output=True, text=True)
         if r.returncode != 0:
             return {"error": "git clone failed", "stderr": r.stderr}
-        global GRAPH
-        GRAPH = build_graph_from_repo(tmp, lang=req.lang)
-        return {"status": "ok", "nodes": GRAPH.g.number_of_nodes(), "edges": GRAPH.g.number_of_edges()}
+        G = _publish(build_graph_from_repo(tmp, lang=req.lang))
+        return {"status": "ok", "nodes": G.g.number_of_nodes(), "edges": G.g.number_of_edges()}
     finally:
         shutil.rmtree(tmp, ignore_errors=True)
 
 @app.post("/query")
-def query(req: QueryReq):
-    if GRAPH is None:
+async def query(req: QueryReq):
+    if _current() is None:
         return {"error": "graph not built; call /build first"}
-    sg = dynamic_query(GRAPH, req.query)
-    return sg.to_json()
+    return await _in_pool(_run_query, req.query)
 
 @app.post("/slice")
-def slice(req: SliceReq):
-    if GRAPH is None:
+async def slice(req: SliceReq):
+    if _current() is None:
         return {"error": "graph not built; call /build first"}
-    if req.kind == "controllers":
-        sg = slice_controllers(GRAPH, neighbors=req.neighbors)
-    elif req.kind == "listeners":
-        sg = slice_listeners(GRAPH, neighbors=req.neighbors)
-    else:
+    if req.kind not in ("controllers", "listeners"):
         return {"error": "unknown slice kind"}
-    return sg.to_json()
+    return await _in_pool(_run_slice, req.kind, req.neighbors)
 
 @app.post("/llm-pack")
-def pack(req: PackReq):
-    if GRAPH is None:
+async def pack(req: PackReq):
+    if _current() is None:
         return {"error": "graph not built; call /build first"}
     out = os.path.join(req.out_dir, req.scenario)
-    build_llm_pack(GRAPH, req.scenario, out)
+    await _in_pool(_run_pack, req.scenario, out)
     return {"status": "ok", "out": out}
\ No newline at end of file
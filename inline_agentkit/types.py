@@ -1,6 +1,11 @@
 from __future__ import annotations
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 from typing import Any, Dict, Optional
+import operator
+import sys
+
+# Drop the per-instance __dict__ where dataclasses support it (3.10+).
+_DC_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
 
 @dataclass
 class GraphState:
@@ -11,7 +16,7 @@ class GraphState:
     repo_ref: Optional[str] = None
     ts: Optional[str] = None
 
-@dataclass
+@dataclass(**_DC_SLOTS)
 class Query:
     text: Optional[str] = None
     kind: Optional[str] = None
@@ -24,6 +29,11 @@ class Query:
     neighbors: int = 0
 
     def to_dict(self) -> Dict[str, Any]:
+        """Set fields only: None and empty lists/dicts are left out (0 and "" are kept)."""
         return {
-            k: v for k, v in self.__dict__.items() if v not in (None, [], {})
-        }
\ No newline at end of file
+            k: v for k, v in zip(_QUERY_FIELDS, _query_values(self))
+            if v is not None and v != [] and v != {}
+        }
+
+_QUERY_FIELDS = tuple(f.name for f in fields(Query))
+_query_values = operator.attrgetter(*_QUERY_FIELDS)
\ No newline at end of file
@@ -11,10 +11,15 @@ End-to-end test script:
 import sys
 import os
 import json
+import functools
 from dataclasses import asdict, is_dataclass
 
 import matplotlib.pyplot as plt
 import networkx as nx
+try:  # optional: native JSON encoder for the (large) graph exports
+    import orjson
+except ImportError:
+    orjson = None
 
 # --- Project imports ---------------------------------------------------------
 # Make "codegraph" importable when run from repo root
@@ -22,17 +27,44 @@ ROOT_DIR = os.path.dirname(__file__)
 sys.path.insert(0, ROOT_DIR)
 sys.path.insert(0, os.path.join(ROOT_DIR, 'codegraph'))
 
-from codegraph.graph_builder import build_graph_from_repo
+from codegraph.graph_builder import build_graph_from_repo, _iter_source_files
 from codegraph.java_parser_treesitter import parse_java_source_ts  # noqa: F401 (imported for completeness)
 from codegraph.exporters import export_json
 from codegraph.manual_queries import slice_controllers
 
 
 # --- Helpers ----------------------------------------------------------------
-def call_build_graph_from_repo(repo_path: str, lang: str = "auto"):
+def _source_stamp(repo_path: str, lang: str) -> int:
+    """Hash of (path, mtime, size) for every file the builder would parse.
+
+    Uses the builder's own walk, so skipped trees (.git, node_modules, ...)
+    don't invalidate it; added, removed and edited sources do.
+    """
+    return hash(tuple((path, st.st_mtime_ns, st.st_size) if st is not None else (path,)
+                      for path, _, st in _iter_source_files(repo_path, lang)))
+
+
+@functools.lru_cache(maxsize=8)
+def _build_cached(repo_path: str, lang: str, stamp: int):
     return build_graph_from_repo(repo_path, lang)
 
 
+def call_build_graph_from_repo(repo_path: str, lang: str = "auto"):
+    # Rebuilding is a full walk + parse; a stat pass is enough to tell that
+    # nothing under repo_path changed since the last build in this process.
+    # The cached graph is shared between callers, so don't mutate it.
+    return _build_cached(repo_path, lang, _source_stamp(repo_path, lang))
+
+
+def fast_export_json(graph, path: str):
+    """export_json's compact output, encoded in one orjson call when available."""
+    if orjson is None:
+        return export_json(graph, path)
+    data = orjson.dumps(graph.to_json(), default=str, option=orjson.OPT_NON_STR_KEYS)
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
 def ensure_outdir(path: str):
     os.makedirs(path, exist_ok=True)
 
@@ -236,14 +268,7 @@ def visualize_codegraph(
 
 
 # --- Main -------------------------------------------------------------------
-if __name__ == "__main__":
-    base_path = "/Users/saichaitanyadarla/Documents/java"   # <-- change if needed
-    out_dir = os.path.join(ROOT_DIR, 'out')
-    ensure_outdir(out_dir)
-
-    # Build main graph
-    print("Building graph from current directory...")
-    graph = call_build_graph_from_repo(base_path)
+def export_full(graph, out_dir: str):
     print(f"Graph has {len(graph.g.nodes)} nodes and {len(graph.g.edges)} edges")
 
     # Controllers slice
@@ -252,8 +277,8 @@ if __name__ == "__main__":
     print(f"Controllers slice has {len(controllers_graph.g.nodes)} nodes")
 
     # Export (legacy)
-    export_json(graph, os.path.join(out_dir, "code_graph.json"))
-    export_json(controllers_graph, os.path.join(out_dir, "controllers_graph.json"))
+    fast_export_json(graph, os.path.join(out_dir, "code_graph.json"))
+    fast_export_json(controllers_graph, os.path.join(out_dir, "controllers_graph.json"))
 
     # Dump nodes/edges
     full_nodes, full_edges = dump_nodes_edges_inline(graph, out_dir, prefix="full_")
@@ -270,13 +295,12 @@ if __name__ == "__main__":
                         os.path.join(out_dir, "controllers_graph.graphml"),
                         layout="spring", label_by="auto", show_edge_labels=True)
 
-    # Java-only pass
-    print("Building Java-only graph...")
-    java_graph = call_build_graph_from_repo(base_path, lang="java")
+
+def export_java(java_graph, out_dir: str):
     java_controllers = slice_controllers(java_graph, neighbors=1)
 
-    export_json(java_graph, os.path.join(out_dir, "java_graph.json"))
-    export_json(java_controllers, os.path.join(out_dir, "java_controllers.json"))
+    fast_export_json(java_graph, os.path.join(out_dir, "java_graph.json"))
+    fast_export_json(java_controllers, os.path.join(out_dir, "java_controllers.json"))
 
     j_nodes, j_edges = dump_nodes_edges_inline(java_graph, out_dir, prefix="java_")
     jc_nodes, jc_edges = dump_nodes_edges_inline(java_controllers, out_dir, prefix="java_controllers_")
@@ -290,3 +314,18 @@ if __name__ == "__main__":
                         os.path.join(out_dir, "java_controllers_graph.png"),
                         os.path.join(out_dir, "java_controllers_graph.graphml"),
                         layout="spring", label_by="auto")
+
+
+if __name__ == "__main__":
+    base_path = "/Users/saichaitanyadarla/Documents/java"   # <-- change if needed
+    out_dir = os.path.join(ROOT_DIR, 'out')
+    ensure_outdir(out_dir)
+
+    # One build at a time: build_graph_from_repo already parses over a pool
+    # of its own, and in one process the Java-only pass reuses the .java
+    # files the full pass parsed.
+    print("Building graph from current directory...")
+    export_full(call_build_graph_from_repo(base_path), out_dir)
+
+    print("Building Java-only graph...")
+    export_java(call_build_graph_from_repo(base_path, lang="java"), out_dir)
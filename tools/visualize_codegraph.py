@@ -7,6 +7,10 @@ def visualize_codegraph(
     layout: str = "spring",              # spring | kamada_kawai | circular | shell
     label_by: str = "auto",              # auto | fqn | name | id
     show_edge_labels: bool = True,
+    cache_layout: bool = True,
+    max_png_nodes: int | None = 2000,
+    max_edge_labels: int | None = 300,
+    dpi: int = 120,
 ) -> str:
     """
     Render a CodeGraph (nodes/edges JSON) to a PNG diagram and optional GraphML.
@@ -18,46 +22,119 @@ def visualize_codegraph(
     layout:          graph layout algorithm
     label_by:        which field to prefer for node labels
     show_edge_labels:draw text labels for edge types on the PNG
+    cache_layout:    reuse kamada_kawai / large spring positions computed earlier for
+                     the same graph (the 64 most recent are kept under ~/.cache/codegraph)
+    max_png_nodes:   above this many nodes nothing is drawn: the PNG is a short notice and
+                     GraphML is always written (next to out_png if out_graphml is None);
+                     None always draws
+    max_edge_labels: above this many edges, only the first edge of each type is labelled
+                     (none when all edges share one type); None labels every edge
+    dpi:             resolution of the PNG; pixel count (and encode time) grows as dpi**2
 
     Returns the PNG path.
     """
     import json
+    import os
+    import sys
+    if "matplotlib.pyplot" not in sys.modules:
+        # nothing is shown on screen, so skip GUI backend start-up; left alone
+        # once pyplot is loaded, as switching then closes the caller's figures
+        import matplotlib
+        matplotlib.use("Agg", force=False)
     import matplotlib.pyplot as plt
     import networkx as nx
+    try:  # optional C parser; the exports can be large
+        import orjson
+    except ImportError:
+        orjson = None
 
-    with open(nodes_json_path, 'r', encoding='utf-8') as f:
-        nodes = json.load(f)
-    with open(edges_json_path, 'r', encoding='utf-8') as f:
-        edges = json.load(f)
+    def _load(path: str):
+        with open(path, 'rb') as f:
+            data = f.read()
+        if orjson is not None:
+            try:
+                return orjson.loads(data)
+            except orjson.JSONDecodeError:
+                pass  # e.g. NaN literals, which only the stdlib accepts
+        return json.loads(data.decode('utf-8'))
 
-    # Build networkx DiGraph
-    G = nx.DiGraph()
+    def _iter_edges(path: str):
+        # edges.json is usually the biggest export and each edge is used once,
+        # so stream it when ijson is around rather than holding the whole list
+        try:
+            import ijson
+        except ImportError:
+            yield from _load(path)
+            return
+        with open(path, 'rb') as f:
+            yield from ijson.items(f, 'item')
+
+    nodes = _load(nodes_json_path)
+    edges = _iter_edges(edges_json_path)
+
+    # Build networkx DiGraph: node dicts get their type/label keys first,
+    # then nodes and edges go in through the bulk add_*_from paths.
+    # There are only a handful of node/edge types, so each one's string is
+    # made (and interned) once and shared by every node or edge of that type.
+    type_strs: dict = {}
+
+    def _type_str(t) -> str:
+        try:
+            return type_strs[t]
+        except KeyError:
+            s = type_strs[t] = sys.intern(str(t.name if hasattr(t, "name") else t))
+            return s
+
+    # label_by picks the lookup order once; labels (node id -> drawn label)
+    # is filled in the same pass, later nodes with the same id winning as
+    # they do in the graph
+    k1, k2, k3 = {"name": ("name", "fqn", "id"), "id": ("id", "name", "fqn")}.get(
+        label_by, ("fqn", "name", "id"))  # fqn | auto
+    labels: dict = {}
+    node_items = []
     for n in nodes:
+        n["_type_str"] = _type_str(n.get("type") or "UNKNOWN")
+        n["_label"] = label = n.get(k1) or n.get(k2) or n.get(k3)
         nid = n.get("id") or n.get("fqn") or n.get("name")
-        ntype = n.get("type")
-        if hasattr(ntype, "name"):
-            ntype = ntype.name
-        n["_type_str"] = str(ntype or "UNKNOWN")
-
-        if label_by == "fqn":
-            n["_label"] = n.get("fqn") or n.get("name") or n.get("id")
-        elif label_by == "name":
-            n["_label"] = n.get("name") or n.get("fqn") or n.get("id")
-        elif label_by == "id":
-            n["_label"] = n.get("id") or n.get("name") or n.get("fqn")
-        else:  # auto
-            n["_label"] = n.get("fqn") or n.get("name") or n.get("id")
-
-        G.add_node(nid, **n)
-
-    for e in edges:
-        src = e.get("src") or e.get("source")
-        dst = e.get("dst") or e.get("target")
-        et = e.get("type", "EDGE")
-        if hasattr(et, "name"):
-            et = et.name
-        if src and dst:
-            G.add_edge(src, dst, type=str(et))
+        labels[nid] = label
+        node_items.append((nid, n))
+
+    G = nx.DiGraph()
+    G.add_nodes_from(node_items)
+
+    def _edge_tuples(edges):
+        for e in edges:
+            src = e.get("src") or e.get("source")
+            dst = e.get("dst") or e.get("target")
+            if src and dst:
+                yield src, dst, {"type": _type_str(e.get("type", "EDGE"))}
+
+    G.add_edges_from(_edge_tuples(edges))
+    if len(labels) < G.number_of_nodes():
+        for nid in G:  # nodes only named by an edge
+            labels.setdefault(nid, nid)
+
+    def _write_graphml(path: str) -> None:
+        # Only label and type: the raw JSON fields would bloat the XML several
+        # times over, and the nested ones (lists, dicts) aren't GraphML values.
+        H = nx.DiGraph()
+        H.add_nodes_from((nid, {"label": str(labels[nid]), "type": d.get("_type_str", "UNKNOWN")})
+                         for nid, d in G.nodes(data=True))
+        H.add_edges_from(G.edges(data=True))
+        nx.write_graphml(H, path)
+
+    # Too big to draw legibly: layout and matplotlib artists would dominate
+    # the run time for an unreadable raster, so hand over GraphML instead.
+    if max_png_nodes is not None and G.number_of_nodes() > max_png_nodes:
+        out_graphml = out_graphml or os.path.splitext(out_png)[0] + ".graphml"
+        _write_graphml(out_graphml)
+        plt.figure(figsize=(8, 2))
+        plt.text(0.5, 0.5, f"{G.number_of_nodes()} nodes: too large to draw.\nSee {os.path.basename(out_graphml)}",
+                 ha="center", va="center")
+        plt.axis("off")
+        plt.savefig(out_png, dpi=72)
+        plt.close()
+        return out_png
 
     # Color palette by node type
     palette = {
@@ -68,45 +145,143 @@ def visualize_codegraph(
         "UNKNOWN": "#E0E0E0",
     }
 
-    node_colors, node_sizes, labels = [], [], {}
-    for nid, data in G.nodes(data=True):
-        t = data.get("_type_str", "UNKNOWN")
-        node_colors.append(palette.get(t, palette["UNKNOWN"]))
-        # size heuristic
-        size = 1200
-        if t in ("FILE", "PACKAGE"): size = 2000
-        elif t in ("CLASS", "INTERFACE", "ENUM"): size = 1600
-        elif t == "METHOD": size = 1300
-        node_sizes.append(size)
-        labels[nid] = data.get("_label", nid)
-
-    # Layout
-    if layout == "kamada_kawai":
-        pos = nx.kamada_kawai_layout(G)
-    elif layout == "circular":
-        pos = nx.circular_layout(G)
-    elif layout == "shell":
-        pos = nx.shell_layout(G)
-    else:
-        pos = nx.spring_layout(G, seed=42, k=1.0/(1 + max(len(G.nodes()),1)**0.5))
+    # size heuristic
+    sizes = {"FILE": 2000, "PACKAGE": 2000, "CLASS": 1600, "INTERFACE": 1600, "ENUM": 1600, "METHOD": 1300}
+
+    # One type column; colour and size are looked up once per distinct type
+    # and spread back over the nodes by index. Colours go in as an RGBA array
+    # so matplotlib has no hex strings left to parse per node.
+    import numpy as np
+    from matplotlib.colors import to_rgba_array
+    node_data = G.nodes(data=True)
+    types = np.array([data.get("_type_str", "UNKNOWN") for _, data in node_data], dtype=object)
+    distinct, idx = np.unique(types, return_inverse=True)
+    color_lut = to_rgba_array([palette.get(t, palette["UNKNOWN"]) for t in distinct])
+    size_lut = np.array([sizes.get(t, 1200) for t in distinct], dtype=float)
+    node_colors = color_lut[idx]
+    node_sizes = size_lut[idx]
+
+    def _spring_f32(k: float, seed: int = 42, iterations: int = 50) -> dict:
+        # NetworkX's fixed-step Fruchterman-Reingold, in float32 numpy: no
+        # scipy needed, half the bytes per step, and pair forces taken a block
+        # of rows at a time so memory stays O(block * n).
+        n = G.number_of_nodes()
+        A = nx.to_numpy_array(G, dtype=np.float32, weight=None)
+        X = np.random.default_rng(seed).random((n, 2), dtype=np.float32)
+        t = np.float32(max(np.ptp(X, axis=0)) * 0.1)
+        dt = t / np.float32(iterations + 1)
+        kk = np.float32(k * k)
+        disp = np.empty_like(X)
+        for _ in range(iterations):
+            for i in range(0, n, 1024):
+                delta = X[i:i + 1024, None, :] - X[None, :, :]
+                dist = np.maximum(np.sqrt((delta * delta).sum(axis=-1)), np.float32(0.01))
+                force = kk / (dist * dist) - A[i:i + 1024] * dist / np.float32(k)
+                disp[i:i + 1024] = np.einsum("ijk,ij->ik", delta, force)
+            length = np.maximum(np.sqrt((disp * disp).sum(axis=-1)), np.float32(0.01))
+            step = disp * (t / length)[:, None]
+            X += step
+            t -= dt
+            if np.sqrt((step * step).sum(axis=-1)).sum() / n < 1e-4:
+                break
+        X = nx.rescale_layout(X.astype(float))
+        return dict(zip(G, X))
+
+    # Layout. Positions depend only on the graph's structure and the layout,
+    # so the expensive ones (kamada_kawai, spring on 500+ nodes) are kept on
+    # disk and reused when the same graph is re-rendered with other labels.
+    # Entries are plain float arrays (rows in sorted node order, loaded with
+    # allow_pickle=False); only the most recently used ones are kept.
+    import glob, hashlib
+    cache_dir = os.path.expanduser("~/.cache/codegraph")
+    cache_path = None
+    expensive = layout == "kamada_kawai" or (
+        layout not in ("circular", "shell") and G.number_of_nodes() >= 500)
+    if cache_layout and expensive:
+        order = sorted(G.nodes())
+        h = hashlib.blake2b(digest_size=20)
+        for part in (layout, nx.__version__, repr(order), repr(sorted(G.edges()))):
+            h.update(part.encode("utf-8")); h.update(b"\0")
+        cache_path = os.path.join(cache_dir, f"layout_{h.hexdigest()}.npy")
+
+    pos = None
+    if cache_path and os.path.exists(cache_path):
+        try:
+            arr = np.load(cache_path, allow_pickle=False)
+            if arr.shape == (len(order), 2):
+                pos = dict(zip(order, arr))
+                os.utime(cache_path)  # most recently used
+        except (OSError, ValueError):
+            pos = None  # unreadable entry: recompute and overwrite
+    if pos is None:
+        if layout == "kamada_kawai":
+            pos = nx.kamada_kawai_layout(G)
+        elif layout == "circular":
+            pos = nx.circular_layout(G)
+        elif layout == "shell":
+            pos = nx.shell_layout(G)
+        else:
+            k = 1.0/(1 + max(len(G.nodes()),1)**0.5)
+            if G.number_of_nodes() >= 500:
+                # Large graphs: NetworkX's energy-based spring layout (L-BFGS
+                # over the FR energy) converges in far fewer steps than
+                # fixed-step FR. It needs networkx>=3.5 and scipy; without
+                # them, fixed-step FR in float32 (NetworkX's own large-graph
+                # path needs scipy too).
+                try:
+                    pos = nx.spring_layout(G, seed=42, k=k, method="energy")
+                except (TypeError, ImportError):
+                    pos = _spring_f32(k)
+            if pos is None:
+                pos = nx.spring_layout(G, seed=42, k=k)
+        if cache_path:
+            try:  # caching is best-effort
+                os.makedirs(cache_dir, exist_ok=True)
+                with open(cache_path, "wb") as f:
+                    np.save(f, np.array([pos[n] for n in order], dtype=float))
+                entries = sorted(glob.glob(os.path.join(cache_dir, "layout_*")), key=os.path.getmtime)
+                for old in entries[:-64]:
+                    os.remove(old)
+            except OSError:
+                pass
 
     # Draw
     plt.figure(figsize=(18, 13))
     nx.draw_networkx_nodes(G, pos, node_color=node_colors, node_size=node_sizes,
                            edgecolors="#37474F", linewidths=0.8)
     nx.draw_networkx_labels(G, pos, labels=labels, font_size=7)
-    nx.draw_networkx_edges(G, pos, arrows=True, arrowstyle="-|>", arrowsize=12,
-                           width=1.0, alpha=0.85)
-    if show_edge_labels:
-        edge_labels = nx.get_edge_attributes(G, "type")
-        nx.draw_networkx_edge_labels(G, pos, edge_labels=edge_labels, font_size=6)
+    # Past ~1000 edges one FancyArrowPatch per edge dominates the draw;
+    # without arrowheads NetworkX draws them all as a single LineCollection.
+    if G.number_of_edges() <= 1000:
+        nx.draw_networkx_edges(G, pos, arrows=True, arrowstyle="-|>", arrowsize=12,
+                               width=1.0, alpha=0.85)
+    else:
+        nx.draw_networkx_edges(G, pos, arrows=False, width=1.0, alpha=0.85)
+    if show_edge_labels and G.number_of_edges():
+        labelled = [(u, v, d["type"]) for u, v, d in G.edges(data=True) if d.get("type") is not None]
+        if max_edge_labels is not None and len(labelled) > max_edge_labels:
+            # dense graph: every label would repeat one of a handful of types,
+            # so each type is shown once, on a representative edge
+            first: dict = {}
+            for u, v, et in labelled:
+                first.setdefault(et, (u, v, et))
+            labelled = list(first.values()) if len(first) > 1 else []
+        if labelled:
+            # midpoints in bulk, then a text artist per label
+            ends = np.array([(pos[u], pos[v]) for u, v, _ in labelled], dtype=float)
+            mids = ends.mean(axis=1)
+            ax = plt.gca()
+            bbox = dict(boxstyle="round", ec=(1.0, 1.0, 1.0), fc=(1.0, 1.0, 1.0))
+            for (x, y), (_, _, et) in zip(mids.tolist(), labelled):
+                ax.text(x, y, et, size=6, ha="center", va="center", bbox=bbox,
+                        clip_on=True, zorder=1)
 
     plt.axis("off")
-    plt.tight_layout()
-    plt.savefig(out_png, dpi=220)
+    plt.subplots_adjust(left=0, right=1, top=1, bottom=0)  # axis is off; no need to measure every label
+    plt.savefig(out_png, dpi=dpi)
     plt.close()
 
     if out_graphml:
-        nx.write_graphml(G, out_graphml)
+        _write_graphml(out_graphml)
 
     return out_png